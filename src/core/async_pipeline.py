@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+"""
+Concurrent prefetch of per-filing inputs for the SEC pipeline.
+
+For every master-index entry the pipeline needs the .txt submission, the primary
+HTML document (as clean text) and an LLM extraction. These steps are pure I/O, so
+they are fanned out with asyncio.gather over one shared httpx.AsyncClient and
+bounded by semaphores to stay polite with SEC and the OpenAI API.
+
+Single responsibility: produce PrefetchedFiling bundles; the caller keeps all
+mapping/enrichment logic.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import asyncio
+
+import httpx
+
+from src.processors.filing_parser import parse_filing_header
+from src.processors.filing_processor import SEC_ARCHIVES_URL
+from src.processors.html_parser import html_to_text, parse_html_to_text_cached
+from src.processors.llm_extractor import (
+    LLMExtractionResult,
+    llm_batch_mode_enabled,
+    llm_extract_async,
+    llm_extract_batch,
+)
+from src.utils.filing_link_converter import find_html_link
+from src.utils.sec_client import MAX_BODY_BYTES, sec_async_client
+
+DEFAULT_MAX_CONCURRENCY = 10
+MAX_RETRIES = 3
+
+
+@dataclass
+class PrefetchedFiling:
+    file_name: str
+    content: str = ""
+    html_link: Optional[str] = None
+    parsed_text: Optional[str] = None
+    llm_res: Optional[LLMExtractionResult] = None
+
+
+async def _read_body(client: httpx.AsyncClient, url: str, max_bytes: Optional[int]) -> Tuple[bytes, Optional[str]]:
+    """Stream a GET response, stopping after `max_bytes`. Returns (body, charset).
+
+    The charset is the one declared in Content-Type, or None.
+
+    Throttled (429) responses are retried with exponential backoff.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        async with client.stream("GET", url) as resp:
+            if resp.status_code == 429 and attempt < MAX_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            resp.raise_for_status()
+            if max_bytes is None:
+                return await resp.aread(), resp.charset_encoding
+            buf = bytearray()
+            async for chunk in resp.aiter_bytes():
+                buf += chunk
+                if len(buf) >= max_bytes:
+                    break
+            return bytes(buf[:max_bytes]), resp.charset_encoding
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+async def fetch_filing_text_async(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    file_name: str,
+    max_bytes: Optional[int] = MAX_BODY_BYTES,
+) -> str:
+    """Async counterpart of `fetch_filing_text`; returns "" on failure."""
+    try:
+        async with sem:
+            body, encoding = await _read_body(client, f"{SEC_ARCHIVES_URL}{file_name}", max_bytes)
+        return body.decode(encoding or "utf-8", errors="ignore")
+    except httpx.HTTPError as e:
+        print(f"Could not fetch filing {file_name}: {e}")
+        return ""
+
+
+async def parse_html_to_text_async(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    url: Optional[str],
+    max_bytes: Optional[int] = MAX_BODY_BYTES,
+) -> Optional[str]:
+    """Async counterpart of `parse_html_to_text`; returns None on failure."""
+    if not url:
+        return None
+    try:
+        async with sem:
+            body, encoding = await _read_body(client, url, max_bytes)
+        return html_to_text(body, encoding)
+    except httpx.HTTPError as e:
+        print(f"[HTML Parser] Error fetching URL {url}: {e}")
+        return None
+    except Exception as e:
+        print(f"[HTML Parser] An unexpected error occurred while parsing {url}: {e}")
+        return None
+
+
+async def fetch_html_texts(
+    urls: Sequence[str],
+    user_agent: str,
+    *,
+    max_concurrency: int = 5,
+) -> List[Optional[str]]:
+    """Fetch and clean several documents concurrently, in input order.
+
+    Runs the memoized blocking parser in worker threads, so documents already
+    seen in this run (including misses) are not downloaded again.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _one(url: str) -> Optional[str]:
+        async with sem:
+            return await asyncio.to_thread(parse_html_to_text_cached, url, user_agent)
+
+    return list(await asyncio.gather(*(_one(u) for u in urls)))
+
+
+def _company(item: PrefetchedFiling) -> Optional[str]:
+    return parse_filing_header(item.content).get("COMPANY CONFORMED NAME")
+
+
+async def _prefetch_one(
+    client: httpx.AsyncClient,
+    sec_sem: asyncio.Semaphore,
+    llm_sem: Optional[asyncio.Semaphore],
+    file_name: str,
+) -> PrefetchedFiling:
+    item = PrefetchedFiling(file_name=file_name)
+    item.content = await fetch_filing_text_async(client, sec_sem, file_name)
+    if not item.content:
+        return item
+
+    # The .txt submission is already in hand, so resolve the HTML link from it
+    # instead of downloading it a second time.
+    try:
+        item.html_link = find_html_link(f"{SEC_ARCHIVES_URL}{file_name}", item.content)
+    except Exception as e:
+        print(f"An error occurred while resolving the HTML link for {file_name}: {e}")
+    item.parsed_text = await parse_html_to_text_async(client, sec_sem, item.html_link)
+
+    # llm_sem is None in batch mode: extractions are submitted together afterwards
+    if item.parsed_text and llm_sem is not None:
+        async with llm_sem:
+            item.llm_res = await llm_extract_async(item.parsed_text, company=_company(item))
+    return item
+
+
+def _apply_batch_extractions(items: List[PrefetchedFiling]) -> None:
+    """Run all LLM extractions as one Batch API job and attach the results."""
+    batch_items = [(str(i), it.parsed_text, _company(it)) for i, it in enumerate(items) if it.parsed_text]
+    if not batch_items:
+        return
+    results = llm_extract_batch(batch_items)
+    for custom_id, res in results.items():
+        items[int(custom_id)].llm_res = res
+
+
+async def prefetch_filings(
+    file_names: Sequence[str],
+    user_agent: str,
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[PrefetchedFiling]:
+    """Fetch text, HTML and LLM extraction for all filings concurrently.
+
+    Args:
+        file_names: File name paths from the master index.
+        user_agent: The User-Agent header for SEC requests.
+        max_concurrency: Upper bound on in-flight SEC requests (and, separately, LLM calls).
+        client: Optional pre-configured client (tests); must already carry the User-Agent.
+
+    With LLM_BATCH_MODE enabled, extractions go through the OpenAI Batch API after
+    all documents are fetched, which blocks until the batch completes.
+
+    Returns:
+        One PrefetchedFiling per input, in input order.
+    """
+    if not user_agent:
+        raise ValueError("A User-Agent is required for SEC requests.")
+
+    batch_mode = llm_batch_mode_enabled()
+    sec_sem = asyncio.Semaphore(max_concurrency)
+    llm_sem = None if batch_mode else asyncio.Semaphore(max_concurrency)
+
+    async def _run(c: httpx.AsyncClient) -> List[PrefetchedFiling]:
+        items = list(await asyncio.gather(*(_prefetch_one(c, sec_sem, llm_sem, f) for f in file_names)))
+        if batch_mode:
+            await asyncio.to_thread(_apply_batch_extractions, items)
+        return items
+
+    if client is not None:
+        return await _run(client)
+    async with sec_async_client(
+        user_agent,
+        max_connections=2 * max_concurrency,
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        follow_redirects=True,
+    ) as c:
+        return await _run(c)
+
+
+def prefetch_filings_sync(file_names: Sequence[str], user_agent: str, **kwargs) -> List[PrefetchedFiling]:
+    """Blocking wrapper around `prefetch_filings` for callers without an event loop."""
+    return asyncio.run(prefetch_filings(file_names, user_agent, **kwargs))
@@ -10,7 +10,7 @@ if str(project_root) not in sys.path:
 # Now that the path is set, we can import our modules
 import asyncio
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import telegram
 import smtplib
 from email.message import EmailMessage
@@ -25,15 +25,13 @@ from src.models.corporate_action_model import (
     SecurityRef,
     SourceInfo,
 )
-from src.sources.master_index import get_recent_8k_filings
-from src.processors.filing_processor import fetch_filing_text
+from src.sources.master_index import get_recent_8k_filings_async
 from src.processors.filing_parser import parse_filing_header, classify_action_type
-from src.processors.html_parser import parse_html_to_text
-from src.utils.cik_mapper import CIKMapper
-from src.utils.filing_link_converter import convert_txt_link_to_html
-from src.processors.llm_extractor import llm_extract, apply_llm_to_corporate_action
+from src.utils.cik_mapper import get_cik_mapper
+from src.processors.llm_extractor import llm_extract_async, apply_llm_to_corporate_action
 from src.utils.exchange_resolver import get_exchange_resolver
 from src.core.ca_repository import persist_corporate_actions
+from src.core.async_pipeline import fetch_html_texts, prefetch_filings
 from src.processors.effective_date_resolver import (
     resolve_effective_date,
     format_estimate_for_display,
@@ -86,6 +84,35 @@ def _to_mic(exchange_name: Optional[str]) -> Optional[str]:
     return resolver.to_mic(exchange_name)
 
 
+def _enrich_filings(filings_df, cik_mapper) -> Dict[str, Dict[str, Optional[str]]]:
+    """Primary ticker, exchange and MIC for every CIK in the index slice, via bulk joins.
+
+    Returns {unpadded CIK: {"ticker", "exchange", "exchange_mic"}}.
+    """
+    if filings_df.empty:
+        return {}
+    ciks = filings_df[['cik']].drop_duplicates()
+    enriched = ciks.assign(cik=ciks['cik'].str.strip()).merge(cik_mapper.to_dataframe(), on='cik', how='left')
+    enriched['exchange_mic'] = get_exchange_resolver().to_mic_series(enriched['exchange'])
+    enriched = enriched.astype(object).where(enriched.notna(), None)
+    return enriched.drop_duplicates('cik').set_index('cik').to_dict('index')
+
+
+def _lookup_enrichment(
+    cik: str,
+    enrichment_by_cik: Dict[str, Dict[str, Optional[str]]],
+    cik_mapper,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """(ticker or 'N/A', exchange, MIC) for a header CIK, from the batch joins when possible."""
+    enrichment = enrichment_by_cik.get(cik.lstrip('0'))
+    if enrichment is not None:
+        return enrichment['ticker'] or 'N/A', enrichment['exchange'], enrichment['exchange_mic']
+    # Header CIK not among the index rows (e.g. a co-registrant): scalar lookups
+    ticker = cik_mapper.get_ticker_by_cik(cik) or 'N/A'
+    exchange = cik_mapper.get_exchange_by_cik(cik) or None
+    return ticker, exchange, _to_mic(exchange) if exchange else None
+
+
 def _mic_to_exchange_name(mic: Optional[str]) -> Optional[str]:
     if not mic:
         return None
@@ -225,12 +252,12 @@ async def main():
         print("EDGAR_IDENTITY or EDGAR_EMAIL not found in .env file. Exiting.")
         return
     user_agent = f"{identity} {email}"
-    cik_mapper = CIKMapper(user_agent=user_agent)
+    cik_mapper = get_cik_mapper(user_agent)
 
     print("Fetching recent 8-K filings...")
     # Fetches filings from the most recent business day.
     # The function will search backwards from yesterday to find the last day with available data.
-    recent_filings_df = get_recent_8k_filings(days_ago=0, user_agent=user_agent)
+    recent_filings_df = await get_recent_8k_filings_async(days_ago=0, user_agent=user_agent)
 
     if recent_filings_df.empty:
         print("No recent 8-K filings found.")
@@ -240,9 +267,16 @@ async def main():
     processed_filings: List[CorporateAction] = []
     metrics = Metrics()
 
-    for i, (_, row) in enumerate(recent_filings_df.head().iterrows()):
-        file_name = row['file_name']
-        content = fetch_filing_text(file_name, user_agent)
+    batch_df = recent_filings_df.head()
+    # Ticker/exchange/MIC for the whole batch in one set of joins instead of per-filing lookups
+    enrichment_by_cik = _enrich_filings(batch_df, cik_mapper)
+
+    # Fetch submissions, primary HTML and LLM extractions for all filings concurrently
+    prefetched = await prefetch_filings(list(batch_df['file_name']), user_agent)
+
+    for item in prefetched:
+        file_name = item.file_name
+        content = item.content
 
         if not content:
             print(f"Skipping {file_name} due to content retrieval failure.")
@@ -254,9 +288,7 @@ async def main():
 
         cik = header_data.get('CENTRAL INDEX KEY', 'N/A')
         print(f"Processing {header_data.get('COMPANY CONFORMED NAME', 'N/A')} with CIK {cik}")
-        ticker = cik_mapper.get_ticker_by_cik(cik) or 'N/A'
-        exchange = cik_mapper.get_exchange_by_cik(cik) or None
-        exchange_mic = _to_mic(exchange) if exchange else None
+        ticker, exchange, exchange_mic = _lookup_enrichment(cik, enrichment_by_cik, cik_mapper)
         print(f"Found Ticker: {ticker}, Exchange: {exchange} -> MIC: {exchange_mic}")
 
         # Collect all tickers for this CIK and compute extras for details
@@ -266,12 +298,10 @@ async def main():
         if all_tickers:
             print(f"Tickers for CIK {cik}: all={all_tickers} primary={primary} extras={extra_tickers}")
 
-        # Construct the full .txt URL to pass to the converter
+        # Full .txt URL, the HTML link resolved from it and the clean HTML text
         txt_url = f"https://www.sec.gov/Archives/{file_name}"
-        html_link = convert_txt_link_to_html(txt_url, user_agent)
-
-        # Parse the HTML content to get clean text
-        parsed_text = parse_html_to_text(html_link, user_agent)
+        html_link = item.html_link
+        parsed_text = item.parsed_text
 
         form_type_str = header_data.get('CONFORMED SUBMISSION TYPE', 'N/A')
         filed_as_of = header_data.get('FILED AS OF DATE', '')
@@ -306,12 +336,10 @@ async def main():
         )
         
         # LLM extraction pass (safe/no-op if disabled or not configured)
-        llm_res = None
-        if parsed_text:
+        llm_res = item.llm_res
+        if llm_res:
             try:
-                llm_res = llm_extract(parsed_text, company=header_data.get('COMPANY CONFORMED NAME', None))
-                if llm_res:
-                    ca = apply_llm_to_corporate_action(ca, llm_res)
+                ca = apply_llm_to_corporate_action(ca, llm_res)
             except Exception as e:
                 print(f"LLM extraction skipped due to error: {e}")
 
@@ -340,14 +368,19 @@ async def main():
                     followups = get_recent_company_filings(cik, user_agent, limit=3, form_filter=[
                         "8-K", "8-K/A", "DEFM14A", "DEFA14A", "S-4", "S-4/A", "425", "424B2", "424B3"
                     ])
-                    for fu in followups:
-                        fu_url = fu.get("html_url") or fu.get("txt_url")
-                        if not fu_url or fu_url == (html_link or txt_url):
-                            continue
-                        fu_text = parse_html_to_text(fu_url, user_agent)
-                        if not fu_text:
-                            continue
-                        fu_res = llm_extract(fu_text, company=header_data.get('COMPANY CONFORMED NAME', None))
+                    fu_urls = [
+                        u for u in ((fu.get("html_url") or fu.get("txt_url")) for fu in followups)
+                        if u and u != (html_link or txt_url)
+                    ]
+                    # Fetch the follow-up documents concurrently, then run their extractions concurrently
+                    fu_texts = await fetch_html_texts(fu_urls, user_agent)
+                    fu_docs = [(u, t) for u, t in zip(fu_urls, fu_texts) if t]
+                    fu_results = await asyncio.gather(*(
+                        # Follow-ups share the primary filing's company key; never answer them from the cache
+                        llm_extract_async(t, company=header_data.get('COMPANY CONFORMED NAME', None), use_cache=False)
+                        for _, t in fu_docs
+                    ))
+                    for (fu_url, _), fu_res in zip(fu_docs, fu_results):
                         if not fu_res:
                             continue
                         if getattr(fu_res, "effective_date", None):
@@ -1,24 +1,32 @@
 import re
 from typing import Dict
 
+# Compiled once; parse_filing_header runs for every filing in a batch
+_SEC_HEADER_PATTERN = re.compile(r'<SEC-HEADER>(.*?)</SEC-HEADER>', re.DOTALL)
+# A more robust regex to capture all key-value pairs.
+_HEADER_LINE_PATTERN = re.compile(r'([A-Z][A-Z\s-]+):\s+(.+)')
+# 8-K item codes checked, in order, when no keyword matches
+_ITEM_PATTERNS = (
+    (re.compile(r'item\s+1\.01'), 'Material Agreement (e.g., Merger)'),
+    (re.compile(r'item\s+5\.02'), 'Director/Officer Change'),
+    (re.compile(r'item\s+2\.01'), 'Completion of Acquisition/Disposition'),
+)
+
 def parse_filing_header(content: str) -> Dict[str, str]:
     """
     Parses the header of an SEC filing to extract key information.
     Finds the <SEC-HEADER> block and extracts key-value pairs from it.
     """
     header_data = {}
-    header_match = re.search(r'<SEC-HEADER>(.*?)</SEC-HEADER>', content, re.DOTALL)
+    header_match = _SEC_HEADER_PATTERN.search(content)
     
     if not header_match:
         return header_data
 
     header_text = header_match.group(1)
     
-    # A more robust regex to capture all key-value pairs.
-    pattern = re.compile(r'([A-Z][A-Z\s-]+):\s+(.+)')
-    
     for line in header_text.split('\n'):
-        match = pattern.match(line.strip())
+        match = _HEADER_LINE_PATTERN.match(line.strip())
         if match:
             key = match.group(1).strip()
             value = match.group(2).strip()
@@ -52,11 +60,8 @@ def classify_action_type(content: str) -> str:
         return 'Delisting'
     
     # Check for Item codes as a fallback
-    if re.search(r'item\s+1\.01', content_lower):
-        return 'Material Agreement (e.g., Merger)'
-    if re.search(r'item\s+5\.02', content_lower):
-        return 'Director/Officer Change'
-    if re.search(r'item\s+2\.01', content_lower):
-        return 'Completion of Acquisition/Disposition'
+    for pattern, label in _ITEM_PATTERNS:
+        if pattern.search(content_lower):
+            return label
 
     return 'Unclassified'
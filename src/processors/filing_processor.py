@@ -1,15 +1,21 @@
+from typing import Optional
+
 import requests
 
+from src.utils.sec_client import MAX_BODY_BYTES, SESSION, read_text
+
 # Base URL for SEC filings
 SEC_ARCHIVES_URL = "https://www.sec.gov/Archives/"
 
-def fetch_filing_text(file_name: str, user_agent: str) -> str:
+def fetch_filing_text(file_name: str, user_agent: str, max_bytes: Optional[int] = MAX_BODY_BYTES) -> str:
     """
     Fetches the text content of a single SEC filing.
 
     Args:
         file_name (str): The file name path from the master index.
         user_agent (str): The User-Agent header for the request.
+        max_bytes (Optional[int]): Only the first `max_bytes` of the filing are read;
+            pass None to download the full submission.
 
     Returns:
         str: The text content of the filing, or an empty string if fetching fails.
@@ -21,10 +27,12 @@ def fetch_filing_text(file_name: str, user_agent: str) -> str:
     headers = {"User-Agent": user_agent}
 
     try:
-        response = requests.get(filing_url, headers=headers)
-        response.raise_for_status()
-        return response.text
+        response = SESSION.get(filing_url, headers=headers, stream=True)
+        try:
+            response.raise_for_status()
+            return read_text(response, max_bytes)
+        finally:
+            response.close()
     except requests.exceptions.RequestException as e:
         print(f"Could not fetch filing {file_name}: {e}")
         return ""
-
@@ -1,30 +1,171 @@
 from typing import Optional
+import codecs
+import functools
+import re
 import requests
-from bs4 import BeautifulSoup
 
-def parse_html_to_text(url: str, user_agent: str) -> Optional[str]:
-    """Fetches HTML from a URL and parses it to extract clean text."""
-    if not url:
+from src.utils.sec_client import MAX_BODY_BYTES, SESSION, read_body
+
+# Prefer selectolax's lexbor (C) backend; fall back to BeautifulSoup if it is missing
+try:
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+except Exception:  # pragma: no cover
+    LexborHTMLParser = None  # type: ignore
+try:
+    from bs4 import BeautifulSoup  # type: ignore
+except Exception:  # pragma: no cover
+    BeautifulSoup = None  # type: ignore
+
+# Elements that start a new line of text; inline runs (span, font, b, ...) are joined as-is,
+# since iXBRL filings wrap every styled run of a sentence in its own tag
+_BLOCK_TAGS = (
+    'address', 'article', 'blockquote', 'br', 'caption', 'center', 'dd', 'div', 'dl', 'dt',
+    'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'ol', 'p', 'pre',
+    'section', 'table', 'title', 'tr', 'ul',
+)
+_BLOCK_SELECTOR = ', '.join(_BLOCK_TAGS)
+# Table cells stay on their row's line, separated by a space
+_CELL_SELECTOR = 'td, th'
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+# Browsers read latin-1/ASCII labels as windows-1252; SEC filings rely on that for smart quotes
+_AS_CP1252 = {'ascii', 'iso8859-1'}
+
+# Runs of horizontal whitespace (incl. &nbsp;) and line breaks with surrounding blanks
+_WS = re.compile(r'[^\S\n]+')
+_NL = re.compile(r'\s*\n\s*')
+
+
+def _codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        codec = codecs.lookup(name.strip()).name
+    except LookupError:
         return None
+    return 'cp1252' if codec in _AS_CP1252 else codec
 
+
+def _decode_html(content: bytes, encoding: Optional[str] = None) -> str:
+    """Decode HTML bytes using the declared charset, then a <meta> charset, then UTF-8/windows-1252."""
+    codec = _codec(encoding)
+    if codec is None:
+        meta = _META_CHARSET.search(content, 0, 4096)
+        codec = _codec(meta.group(1).decode('ascii', 'ignore')) if meta else None
+    if codec is not None:
+        return content.decode(codec, errors='replace')
+    try:
+        return content.decode('utf-8-sig')
+    except UnicodeDecodeError as e:
+        # A byte cap can cut the last multi-byte character; that alone does not rule out UTF-8
+        if e.start >= len(content) - 3:
+            return content[:e.start].decode('utf-8-sig')
+        return content.decode('cp1252', errors='replace')
+
+
+def _extract_text(content: bytes, encoding: Optional[str] = None) -> str:
+    """Return the visible text of an HTML document, without script/style contents."""
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(_decode_html(content, encoding))
+        for tag in tree.css('script, style'):
+            tag.decompose()
+        for tag in tree.css(_BLOCK_SELECTOR):
+            tag.insert_before('\n')
+            tag.insert_after('\n')
+        for tag in tree.css(_CELL_SELECTOR):
+            tag.insert_after(' ')
+        return tree.body.text(separator='') if tree.body else tree.text(separator='')
+
+    # lxml (libxml2) is much faster than 'html.parser'; a declared charset skips sniffing,
+    # otherwise BeautifulSoup reads the document's <meta> charset itself
+    soup = BeautifulSoup(content, 'lxml', from_encoding=encoding)
+    for script_or_style in soup(['script', 'style']):
+        script_or_style.decompose()
+    for tag in soup.find_all(_BLOCK_TAGS):
+        tag.insert_before('\n')
+        tag.insert_after('\n')
+    for tag in soup.find_all(['td', 'th']):
+        tag.insert_after(' ')
+    return soup.get_text()
+
+
+def html_to_text(content: bytes, encoding: Optional[str] = None) -> str:
+    """Converts raw HTML bytes to clean text: single spaces, one text block per line."""
+    text = _extract_text(content, encoding)
+    text = _WS.sub(' ', text)
+    text = _NL.sub('\n', text)
+    return text.strip()
+
+
+def _fetch_html_text(url: str, user_agent: str, max_bytes: Optional[int]) -> str:
+    """Download one document and return its text; request errors propagate."""
+    headers = {"User-Agent": user_agent}
+    response = SESSION.get(url, headers=headers, timeout=10, stream=True)
     try:
-        headers = {"User-Agent": user_agent}
-        response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()  # Raise an exception for bad status codes
+        content = read_body(response, max_bytes)
+        # Only trust a charset the server declared (requests assumes ISO-8859-1 otherwise)
+        content_type = response.headers.get('Content-Type') or ''
+        encoding = response.encoding if 'charset' in content_type.lower() else None
+    finally:
+        response.close()
+
+    return html_to_text(content, encoding)
+
+
+def parse_html_to_text(url: str, user_agent: str, max_bytes: Optional[int] = MAX_BODY_BYTES) -> Optional[str]:
+    """Fetches HTML from a URL and parses it to extract clean text.
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+    Only the first `max_bytes` of the document are downloaded and parsed; pass
+    None when the full text is needed.
+    """
+    if not url:
+        return None
+
+    try:
+        return _fetch_html_text(url, user_agent, max_bytes)
+
+    except requests.RequestException as e:
+        print(f"[HTML Parser] Error fetching URL {url}: {e}")
+        return None
+    except Exception as e:
+        print(f"[HTML Parser] An unexpected error occurred while parsing {url}: {e}")
+        return None
 
-        # Remove script and style elements
-        for script_or_style in soup(['script', 'style']):
-            script_or_style.decompose()
 
-        # Get text and clean it up
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        cleaned_text = '\n'.join(chunk for chunk in chunks if chunk)
+# Statuses that mean the document is gone for good, so a miss is safe to cache
+_GONE_STATUSES = frozenset({404, 410})
 
-        return cleaned_text
+
+@functools.lru_cache(maxsize=1024)
+def _parse_cached(url: str, user_agent: str, max_bytes: Optional[int]) -> Optional[str]:
+    """Fetch and parse one document, memoized per (url, user agent, max_bytes).
+
+    A 404/410 miss (None) is cached; other errors propagate, so a timeout or a
+    throttled response is retried on the next call. Call
+    `_parse_cached.cache_clear()` to reset.
+    """
+    try:
+        return _fetch_html_text(url, user_agent, max_bytes)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code in _GONE_STATUSES:
+            return None
+        raise
+
+
+def parse_html_to_text_cached(url: str, user_agent: str, max_bytes: Optional[int] = MAX_BODY_BYTES) -> Optional[str]:
+    """Memoized `parse_html_to_text` for documents that recur within one run.
+
+    Follow-up filings are shared by every 8-K of the same issuer, so the same
+    URL is requested repeatedly. Only parsed text and definitive 404/410 misses
+    are cached; transient failures return None and are retried next time.
+    """
+    if not url:
+        return None
+
+    try:
+        return _parse_cached(url, user_agent, max_bytes)
 
     except requests.RequestException as e:
         print(f"[HTML Parser] Error fetching URL {url}: {e}")
@@ -9,13 +9,19 @@ LLM-based extraction of corporate action details from filing text.
 This module is intentionally defensive: if the LLM call or parsing fails, callers get None and continue.
 """
 
+import asyncio
+import atexit
+import hashlib
 import json
 import os
 import re
+import time
+import weakref
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from typing import List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -28,12 +34,19 @@ from src.models.corporate_action_model import (
     Ratio,
     SecurityRef,
 )
+from src.processors.semantic_llm_cache import DEFAULT_THRESHOLD, SemanticCache
+
+# Valid ActionType values, computed once at import
+_ACTION_TYPE_VALUES = frozenset(
+    v for k, v in vars(ActionType).items() if not k.startswith("_") and isinstance(v, str)
+)
 
 # Optional import; the module should still import if OpenAI is missing
 try:
-    from openai import OpenAI  # type: ignore
+    from openai import AsyncOpenAI, OpenAI  # type: ignore
 except Exception:  # pragma: no cover
     OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
 
 class LLMMonetary(BaseModel):
@@ -189,9 +202,101 @@ def _get_config() -> LLMCallConfig:
     )
 
 
-def llm_extract(text: str, *, company: Optional[str] = None) -> Optional[LLMExtractionResult]:
+# -------- Client reuse --------
+# Constructing a client sets up an HTTP connection pool; reuse one per API key so
+# consecutive calls keep their connection to the API alive.
+_CLIENT_CACHE: Dict[str, Any] = {}
+# Async clients are bound to the event loop that created their connections
+_ASYNC_CLIENT_CACHE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _get_client(api_key: str):
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None:
+        client = OpenAI(api_key=api_key)
+        _CLIENT_CACHE[api_key] = client
+    return client
+
+
+def _get_async_client(api_key: str):
+    per_loop = _ASYNC_CLIENT_CACHE.setdefault(asyncio.get_running_loop(), {})
+    client = per_loop.get(api_key)
+    if client is None:
+        client = AsyncOpenAI(api_key=api_key)
+        per_loop[api_key] = client
+    return client
+
+
+# -------- Semantic (near-duplicate) result cache --------
+# Enabled by setting LLM_SEMANTIC_CACHE_DIR. The embedded text is the selected prompt
+# text (not the cover page, which barely changes between one issuer's filings), and hits
+# must match the company and the exact dates/amounts/ratios in that text.
+_SEMANTIC_CACHE: Optional[SemanticCache] = None
+# Keeps the embedding input well under the embedding model's 8k-token limit
+_EMBED_CHARS = 8000
+_FACT_TOKENS = re.compile(
+    r"\$\s?\d[\d,]*(?:\.\d+)?"
+    r"|\b\d+(?:\.\d+)?[\s-]*for[\s-]*\d+(?:\.\d+)?\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4}"
+    r"|\b\d{1,2}/\d{1,2}/\d{2,4}\b"
+    r"|\b\d{4}-\d{2}-\d{2}\b",
+    re.IGNORECASE,
+)
+
+
+def _embedding_model() -> str:
+    return os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+
+def _get_semantic_cache() -> Optional[SemanticCache]:
+    global _SEMANTIC_CACHE
+    cache_dir = os.getenv("LLM_SEMANTIC_CACHE_DIR", "").strip()
+    if not cache_dir:
+        return None
+    if _SEMANTIC_CACHE is None or str(_SEMANTIC_CACHE.cache_dir) != str(Path(cache_dir)):
+        try:
+            threshold = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", str(DEFAULT_THRESHOLD)))
+        except ValueError:
+            threshold = DEFAULT_THRESHOLD
+        _SEMANTIC_CACHE = SemanticCache.load(Path(cache_dir), threshold=threshold)
+        # Entries are only appended in memory; write them out once, at exit
+        atexit.register(_SEMANTIC_CACHE.save)
+    return _SEMANTIC_CACHE
+
+
+def _cache_key(selected: str, company: Optional[str]) -> str:
+    """Company plus a digest of the date, amount and ratio tokens of the prompt text.
+
+    Two filings that embed alike but state different dates or amounts (e.g. successive
+    dividend declarations) get different keys, so one never returns the other's result.
+    """
+    facts = "|".join(t.lower() for t in _FACT_TOKENS.findall(selected))
+    return f"{company or ''}|{hashlib.blake2b(facts.encode(), digest_size=8).hexdigest()}"
+
+
+def _cache_lookup(cache: SemanticCache, embedding, key: str) -> Optional[LLMExtractionResult]:
+    if embedding is None:
+        return None
+    try:
+        hit = cache.lookup(embedding, key)
+        return LLMExtractionResult.model_validate_json(hit) if hit is not None else None
+    except Exception:
+        return None
+
+
+def _cache_store(cache: Optional[SemanticCache], embedding, key: str, res: LLMExtractionResult) -> None:
+    if cache is None or embedding is None:
+        return
+    try:
+        cache.add(embedding, res.model_dump_json(), key)
+    except Exception as e:
+        print(f"[LLM Cache] Failed to store extraction: {e}")
+
+
+def llm_extract(text: str, *, company: Optional[str] = None, use_cache: bool = True) -> Optional[LLMExtractionResult]:
     """Call the LLM to extract corporate action data from raw filing text.
 
+    Pass use_cache=False to bypass the semantic cache (e.g. for follow-up filings).
     Returns None if disabled, missing API key, OpenAI not installed, or on error.
     """
     cfg = _get_config()
@@ -200,91 +305,293 @@ def llm_extract(text: str, *, company: Optional[str] = None) -> Optional[LLMExtr
     if not cfg.api_key or OpenAI is None:
         return None
 
-    client = OpenAI(api_key=cfg.api_key)
+    client = _get_client(cfg.api_key)
+    cache = _get_semantic_cache() if use_cache else None
+    selected = _select_prompt_text(text)
+    key = _cache_key(selected, company)
+    embedding = None
+    if cache is not None:
+        try:
+            resp = client.embeddings.create(input=selected[:_EMBED_CHARS], model=_embedding_model())
+            embedding = resp.data[0].embedding
+        except Exception:
+            embedding = None
+        hit = _cache_lookup(cache, embedding, key)
+        if hit is not None:
+            return hit
 
-    system = (
-        "You are a financial extraction assistant. Read SEC filing text and return a compact JSON with key corporate action details. "
-        "If there is no clear corporate action, set action_type to 'other' and leave details null. "
-        "Only output valid JSON matching the schema."
-    )
+    # The selection is already within budget, so _build_messages keeps it as is
+    request = _completion_request(cfg, selected, company)
 
-    allowed_types = [
-        ActionType.FORWARD_SPLIT,
-        ActionType.REVERSE_SPLIT,
-        ActionType.CASH_DIVIDEND,
-        ActionType.STOCK_DIVIDEND,
-        ActionType.SPIN_OFF,
-        ActionType.MERGER_CASH,
-        ActionType.MERGER_STOCK,
-        ActionType.MERGER_CASH_STOCK,
-        ActionType.RIGHTS_OFFERING,
-        ActionType.TENDER_OFFER,
-        ActionType.BUYBACK,
-        ActionType.BANKRUPTCY,
-        ActionType.OTHER,
-    ]
+    try:
+        # Using Chat Completions API for wide compatibility
+        resp = client.chat.completions.create(**request)
+        content = resp.choices[0].message.content or "{}"
+        res = _parse_extraction(content)
+    except Exception:
+        return None
+    _cache_store(cache, embedding, key, res)
+    return res
 
-    user_prompt = {
-        "role": "user",
-        "content": (
-            f"Company: {company or 'Unknown'}\n\n"
-            "Task: Extract the following fields from the filing text.\n"
-            "Return ONLY JSON with this structure and keys: \n"
-            "{\n"
-            "  \"action_type\": one of "
-            + json.dumps(allowed_types)
-            + ",\n"
-            "  \"announce_date\": YYYY-MM-DD or null,\n"
-            "  \"effective_date\": YYYY-MM-DD or null,\n"
-            "  \"ex_date\": YYYY-MM-DD or null,\n"
-            "  \"record_date\": YYYY-MM-DD or null,\n"
-            "  \"pay_date\": YYYY-MM-DD or null,\n"
-            "  \"ratio\": string like '2-for-1' or '0.5' or null,\n"
-            "  \"cash_per_share\": {\"currency\": 'USD', \"amount\": 12.34} or null,\n"
-            "  \"consideration\": [\n"
-            "    {\n"
-            "      \"type\": 'cash'|'stock'|'rights'|'other',\n"
-            "      \"cash_per_share\": {\"currency\": 'USD', \"amount\": 12.34} or null,\n"
-            "      \"stock_ratio\": '0.5' or '1-for-10' or null,\n"
-            "      \"stock_security_ticker\": 'ABC' or null\n"
-            "    }\n"
-            "  ] or null,\n"
-            "  \"effective_date_estimates\": [\n"
-            "    {\n"
-            "      \"kind\": 'definitive'|'estimated'|'window'|'relative',\n"
-            "      \"date\": YYYY-MM-DD or null,\n"
-            "      \"start_date\": YYYY-MM-DD or null,\n"
-            "      \"end_date\": YYYY-MM-DD or null,\n"
-            "      \"relative_to\": short label like 'shareholder_approval' or null,\n"
-            "      \"offset_days\": integer number of days if relative, or null,\n"
-            "      \"qualifier\": short phrase like 'effective on' or 'expected in Q4 2025',\n"
-            "      \"snippet\": <=200-char supporting snippet,\n"
-            "      \"confidence\": 0..1 (your best estimate)\n"
-            "    }\n"
-            "  ] or null,\n"
-            "  \"notes\": optional short string\n"
-            "}\n\n"
-            "If no definitive effective date is present, populate effective_date_estimates with your best candidates, including quarter windows (convert 'Qx YYYY' into start_date/end_date).\n"
-            "Filing text begins below.\n\n"
-            + text[:20000]  # Trim to keep prompt size reasonable
-        ),
-    }
+
+async def llm_extract_async(
+    text: str, *, company: Optional[str] = None, use_cache: bool = True
+) -> Optional[LLMExtractionResult]:
+    """Async variant of `llm_extract` using AsyncOpenAI, for concurrent pipelines.
+
+    Returns None under the same conditions as `llm_extract`.
+    """
+    cfg = _get_config()
+    if not cfg.enabled:
+        return None
+    if not cfg.api_key or AsyncOpenAI is None:
+        return None
+
+    client = _get_async_client(cfg.api_key)
+    cache = _get_semantic_cache() if use_cache else None
+    selected = _select_prompt_text(text)
+    key = _cache_key(selected, company)
+    embedding = None
+    if cache is not None:
+        try:
+            resp = await client.embeddings.create(input=selected[:_EMBED_CHARS], model=_embedding_model())
+            embedding = resp.data[0].embedding
+        except Exception:
+            embedding = None
+        hit = _cache_lookup(cache, embedding, key)
+        if hit is not None:
+            return hit
+
+    request = _completion_request(cfg, selected, company)
 
     try:
-        # Using Chat Completions API for wide compatibility
-        resp = client.chat.completions.create(
-            model=cfg.model,
-            messages=[{"role": "system", "content": system}, user_prompt],
-            temperature=0.1,
-            max_tokens=800,
-        )
+        resp = await client.chat.completions.create(**request)
         content = resp.choices[0].message.content or "{}"
-        # In case the model adds backticks or text, attempt to extract JSON substring
-        json_text = _extract_json_block(content)
-        data = json.loads(json_text)
-        return LLMExtractionResult.model_validate(data)
+        res = _parse_extraction(content)
     except Exception:
         return None
+    _cache_store(cache, embedding, key, res)
+    return res
+
+
+# Batch API statuses after which polling stops
+_BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def llm_batch_mode_enabled() -> bool:
+    """True when LLM_BATCH_MODE requests the (cheaper, non-realtime) Batch API."""
+    return os.getenv("LLM_BATCH_MODE", "false").strip().lower() in {"1", "true", "yes"}
+
+
+def llm_extract_batch(
+    items: Sequence[Tuple[str, str, Optional[str]]],
+    *,
+    poll_interval: float = 10.0,
+    max_poll_interval: float = 300.0,
+    timeout: Optional[float] = None,
+) -> Dict[str, LLMExtractionResult]:
+    """Extract many filings through the OpenAI Batch API (50% cheaper, async within 24h).
+
+    Args:
+        items: (custom_id, text, company) tuples; custom_id must be unique.
+        poll_interval: Initial seconds between status polls (doubles up to max_poll_interval).
+        timeout: Give up after this many seconds (default: LLM_BATCH_TIMEOUT_SECONDS or 24h).
+
+    Returns:
+        Mapping of custom_id -> result for every request that succeeded. Missing ids
+        mean the request failed; an empty dict is returned if disabled or on error.
+    """
+    cfg = _get_config()
+    if not cfg.enabled or not items:
+        return {}
+    if not cfg.api_key or OpenAI is None:
+        return {}
+    if timeout is None:
+        try:
+            timeout = float(os.getenv("LLM_BATCH_TIMEOUT_SECONDS", str(24 * 3600)))
+        except ValueError:
+            timeout = 24 * 3600.0
+
+    client = _get_client(cfg.api_key)
+    lines = [
+        json.dumps(
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _completion_request(cfg, text, company),
+            }
+        )
+        for custom_id, text, company in items
+    ]
+
+    try:
+        batch_input = client.files.create(
+            file=("llm_batch.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+            purpose="batch",
+        )
+        batch = client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+
+        deadline = time.monotonic() + timeout
+        delay = poll_interval
+        while batch.status not in _BATCH_TERMINAL_STATUSES:
+            if time.monotonic() + delay > deadline:
+                print(f"[LLM Batch] Timed out waiting for batch {batch.id} (status={batch.status})")
+                return {}
+            time.sleep(delay)
+            delay = min(delay * 2, max_poll_interval)
+            batch = client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            print(f"[LLM Batch] Batch {batch.id} finished with status {batch.status}")
+            return {}
+        output = client.files.content(batch.output_file_id).text
+    except Exception as e:
+        print(f"[LLM Batch] Batch extraction failed: {e}")
+        return {}
+
+    return _parse_batch_output(output)
+
+
+def _parse_batch_output(output: str) -> Dict[str, LLMExtractionResult]:
+    """Parse Batch API output JSONL into custom_id -> result, skipping failed lines."""
+    results: Dict[str, LLMExtractionResult] = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            response = row.get("response") or {}
+            if row.get("error") or response.get("status_code") != 200:
+                continue
+            content = response["body"]["choices"][0]["message"]["content"] or "{}"
+            results[row["custom_id"]] = _parse_extraction(content)
+        except Exception:
+            continue
+    return results
+
+
+def _completion_request(cfg: LLMCallConfig, text: str, company: Optional[str]) -> Dict[str, Any]:
+    """Chat Completions request body shared by the realtime, async and batch paths."""
+    return {
+        "model": cfg.model,
+        "messages": _build_messages(text, company),
+        "temperature": 0.1,
+        "max_tokens": 800,
+    }
+
+
+# -------- Prompt text selection --------
+_PROMPT_CHARS = 20000
+_WINDOW_CHARS = 2000
+_WINDOW_STEP = 1800  # windows overlap so a phrase is not cut in half at a boundary
+_MAX_WINDOWS = 10
+_KEYWORDS = re.compile(
+    r"\b(merger|split|dividend|record date|effective date|ex-date|tender|spin-?off|ratio|per share)\b",
+    re.IGNORECASE,
+)
+
+
+def _select_prompt_text(text: str, budget: int = _PROMPT_CHARS) -> str:
+    """Pick the most corporate-action-relevant parts of `text` within `budget` chars.
+
+    Short texts are returned unchanged. Longer ones are split into overlapping
+    windows; the first window (cover page) is always kept, the rest are ranked by
+    keyword hits and the winners are joined in document order.
+    """
+    if len(text) <= budget:
+        return text
+    starts = range(0, len(text), _WINDOW_STEP)
+    scores = {i: len(_KEYWORDS.findall(text, i, i + _WINDOW_CHARS)) for i in starts}
+    ranked = sorted((i for i in starts if i and scores[i]), key=lambda i: (-scores[i], i))
+    chosen = sorted([0] + ranked[: _MAX_WINDOWS - 1])
+    return "\n---\n".join(text[i : i + _WINDOW_CHARS] for i in chosen)[:budget]
+
+
+# -------- Prompt --------
+# The system prompt and the schema description never change; build them once.
+_SYSTEM_PROMPT = (
+    "You are a financial extraction assistant. Read SEC filing text and return a compact JSON with key corporate action details. "
+    "If there is no clear corporate action, set action_type to 'other' and leave details null. "
+    "Only output valid JSON matching the schema."
+)
+
+_ALLOWED_TYPES = [
+    ActionType.FORWARD_SPLIT,
+    ActionType.REVERSE_SPLIT,
+    ActionType.CASH_DIVIDEND,
+    ActionType.STOCK_DIVIDEND,
+    ActionType.SPIN_OFF,
+    ActionType.MERGER_CASH,
+    ActionType.MERGER_STOCK,
+    ActionType.MERGER_CASH_STOCK,
+    ActionType.RIGHTS_OFFERING,
+    ActionType.TENDER_OFFER,
+    ActionType.BUYBACK,
+    ActionType.BANKRUPTCY,
+    ActionType.OTHER,
+]
+
+_SCHEMA_BLOCK = (
+    "Task: Extract the following fields from the filing text.\n"
+    "Return ONLY JSON with this structure and keys: \n"
+    "{\n"
+    "  \"action_type\": one of "
+    + json.dumps(_ALLOWED_TYPES)
+    + ",\n"
+    "  \"announce_date\": YYYY-MM-DD or null,\n"
+    "  \"effective_date\": YYYY-MM-DD or null,\n"
+    "  \"ex_date\": YYYY-MM-DD or null,\n"
+    "  \"record_date\": YYYY-MM-DD or null,\n"
+    "  \"pay_date\": YYYY-MM-DD or null,\n"
+    "  \"ratio\": string like '2-for-1' or '0.5' or null,\n"
+    "  \"cash_per_share\": {\"currency\": 'USD', \"amount\": 12.34} or null,\n"
+    "  \"consideration\": [\n"
+    "    {\n"
+    "      \"type\": 'cash'|'stock'|'rights'|'other',\n"
+    "      \"cash_per_share\": {\"currency\": 'USD', \"amount\": 12.34} or null,\n"
+    "      \"stock_ratio\": '0.5' or '1-for-10' or null,\n"
+    "      \"stock_security_ticker\": 'ABC' or null\n"
+    "    }\n"
+    "  ] or null,\n"
+    "  \"effective_date_estimates\": [\n"
+    "    {\n"
+    "      \"kind\": 'definitive'|'estimated'|'window'|'relative',\n"
+    "      \"date\": YYYY-MM-DD or null,\n"
+    "      \"start_date\": YYYY-MM-DD or null,\n"
+    "      \"end_date\": YYYY-MM-DD or null,\n"
+    "      \"relative_to\": short label like 'shareholder_approval' or null,\n"
+    "      \"offset_days\": integer number of days if relative, or null,\n"
+    "      \"qualifier\": short phrase like 'effective on' or 'expected in Q4 2025',\n"
+    "      \"snippet\": <=200-char supporting snippet,\n"
+    "      \"confidence\": 0..1 (your best estimate)\n"
+    "    }\n"
+    "  ] or null,\n"
+    "  \"notes\": optional short string\n"
+    "}\n\n"
+    "If no definitive effective date is present, populate effective_date_estimates with your best candidates, including quarter windows (convert 'Qx YYYY' into start_date/end_date).\n"
+    "Filing text begins below.\n\n"
+)
+
+
+def _build_messages(text: str, company: Optional[str]) -> List[Dict[str, str]]:
+    """Build the chat messages (system + user prompt) for one filing."""
+    user_content = f"Company: {company or 'Unknown'}\n\n{_SCHEMA_BLOCK}{_select_prompt_text(text)}"
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": user_content},
+    ]
+
+
+def _parse_extraction(content: str) -> LLMExtractionResult:
+    """Validate the model's reply straight from JSON text (no intermediate dict)."""
+    # In case the model adds backticks or text, attempt to extract JSON substring
+    json_text = _extract_json_block(content)
+    return LLMExtractionResult.model_validate_json(json_text)
 
 
 def _extract_json_block(text: str) -> str:
@@ -304,9 +611,9 @@ def apply_llm_to_corporate_action(base: CorporateAction, res: LLMExtractionResul
     """Return a new CorporateAction with LLM-derived fields applied conservatively.
 
     Strategy:
-    - Build Terms first to satisfy validators before switching action_type.
+    - Build Terms first, then apply every change in a single model_copy.
     - Only overwrite fields if the LLM provided a confident-looking value.
-    - On any validation error, fall back to returning the original base object.
+    - On any error, fall back to returning the original base object.
     """
     try:
         terms = base.terms.model_copy(deep=True)
@@ -326,33 +633,30 @@ def apply_llm_to_corporate_action(base: CorporateAction, res: LLMExtractionResul
             terms.consideration = cons
 
         # Date fields
-        updated = base.model_copy(
-            update={
-                "announce_date": res.announce_date or base.announce_date,
-                "effective_date": res.effective_date or base.effective_date,
-                "ex_date": res.ex_date or base.ex_date,
-                "record_date": res.record_date or base.record_date,
-                "pay_date": res.pay_date or base.pay_date,
-                "terms": terms,
-                "extracted_fields_version": "v1-llm",
-                "extraction_model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            }
-        )
-
-        # Action type last (to avoid validator conflicts)
+        updates: Dict[str, Any] = {
+            "announce_date": res.announce_date or base.announce_date,
+            "effective_date": res.effective_date or base.effective_date,
+            "ex_date": res.ex_date or base.ex_date,
+            "record_date": res.record_date or base.record_date,
+            "pay_date": res.pay_date or base.pay_date,
+            "terms": terms,
+            "extracted_fields_version": "v1-llm",
+            "extraction_model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            # Keep updated_at stable across the copy
+            "updated_at": base.updated_at,
+        }
+
+        # Action type
         at = (res.action_type or "").strip() or None
-        if at in {v for v in ActionType.__dict__.values() if isinstance(v, str)}:
-            updated = updated.model_copy(update={"action_type": at})
+        if at in _ACTION_TYPE_VALUES:
+            updates["action_type"] = at
 
         # Append LLM note to provenance notes
         note = (res.notes or "").strip()
         if note:
-            merged_note = f"{(updated.notes or '').strip()} | {note}".strip(" |")
-            updated = updated.model_copy(update={"notes": merged_note})
+            updates["notes"] = f"{(base.notes or '').strip()} | {note}".strip(" |")
 
-        # Force updated_at refresh
-        updated = updated.model_copy(update={"updated_at": base.updated_at})
-        return updated
+        return base.model_copy(update=updates)
     except Exception:
         return base
 
@@ -361,5 +665,8 @@ __all__ = [
     "LLMExtractionResult",
     "LLMDateEstimate",
     "llm_extract",
+    "llm_extract_async",
+    "llm_extract_batch",
+    "llm_batch_mode_enabled",
     "apply_llm_to_corporate_action",
 ]
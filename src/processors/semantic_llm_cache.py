@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+"""
+Embedding-based cache for LLM extraction results.
+
+Many 8-K filings repeat the same boilerplate (merger language, safe-harbor text),
+so an exact-hash cache rarely hits. This cache stores one normalized embedding per
+extracted filing and returns the stored result when a new filing is a near-duplicate
+(cosine similarity above `threshold`) from the same issuer.
+
+- Uses faiss.IndexFlatIP when faiss is installed; otherwise a brute-force numpy scan.
+- Results are opaque JSON strings, so this module does not depend on the extractor.
+- Persists to `cache_dir/embeddings.npy` + `cache_dir/results.jsonl` for cross-run reuse;
+  `add` only appends in memory, so callers save once per run, not per entry.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+
+import numpy as np
+
+# Optional import; fall back to numpy inner products if faiss is missing
+try:
+    import faiss  # type: ignore
+except Exception:  # pragma: no cover
+    faiss = None  # type: ignore
+
+DEFAULT_DIM = 1536  # text-embedding-3-small
+DEFAULT_THRESHOLD = 0.97
+
+_EMBEDDINGS_FILE = "embeddings.npy"
+_RESULTS_FILE = "results.jsonl"
+
+
+def _normalize(embedding) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class SemanticCache:
+    """Near-duplicate lookup over (embedding, issuer key) -> JSON result."""
+
+    def __init__(
+        self,
+        dim: int = DEFAULT_DIM,
+        threshold: float = DEFAULT_THRESHOLD,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        self.dim = dim
+        self.threshold = threshold
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # Rows [0, len) are in use; capacity doubles as entries are added (amortized O(1) add)
+        self._buf = np.zeros((0, dim), dtype=np.float32)
+        self._dirty = False
+        self._keys: List[Optional[str]] = []
+        self._results: List[str] = []
+        # Row numbers per key, so a search only scores entries that could be returned
+        self._rows_by_key: Dict[Optional[str], List[int]] = {}
+        self._index = faiss.IndexFlatIP(dim) if faiss is not None else None
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._buf[: len(self._results)]
+
+    def search(self, embedding, key: Optional[str] = None, k: int = 5) -> Tuple[int, float]:
+        """Return (index, cosine score) of the best entry for `key`, or (-1, 0.0).
+
+        Entries of other keys never hide a same-key entry: without faiss only the
+        key's rows are scored; with faiss, `k` doubles until a same-key hit shows up.
+        """
+        rows = self._rows_by_key.get(key)
+        if not rows:
+            return -1, 0.0
+        query = _normalize(embedding)
+        if self._index is None:
+            sims = self._buf[rows] @ query[0]
+            best = int(np.argmax(sims))
+            return rows[best], float(sims[best])
+        n = len(self._results)
+        while True:
+            k = min(k, n)
+            scores, idxs = self._index.search(query, k)
+            for idx, score in zip(idxs[0].tolist(), scores[0].tolist()):
+                if idx >= 0 and self._keys[idx] == key:
+                    return idx, score
+            if k >= n:
+                return -1, 0.0
+            k *= 2
+
+    def get_result(self, idx: int) -> str:
+        return self._results[idx]
+
+    def lookup(self, embedding, key: Optional[str] = None) -> Optional[str]:
+        """Return the cached result if a same-key entry scores above the threshold."""
+        idx, score = self.search(embedding, key)
+        if idx >= 0 and score > self.threshold:
+            return self._results[idx]
+        return None
+
+    def add(self, embedding, result: str, key: Optional[str] = None) -> None:
+        vec = _normalize(embedding)
+        if vec.shape[1] != self.dim:
+            raise ValueError(f"embedding has dimension {vec.shape[1]}, expected {self.dim}")
+        n = len(self._results)
+        if n == self._buf.shape[0]:
+            grown = np.zeros((max(16, 2 * n), self.dim), dtype=np.float32)
+            grown[:n] = self._buf[:n]
+            self._buf = grown
+        self._buf[n] = vec[0]
+        if self._index is not None:
+            self._index.add(vec)
+        self._rows_by_key.setdefault(key, []).append(n)
+        self._keys.append(key)
+        self._results.append(result)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist embeddings and results to cache_dir (no-op without a cache_dir or changes)."""
+        if self.cache_dir is None or not self._dirty:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        np.save(self.cache_dir / _EMBEDDINGS_FILE, self._vectors)
+        tmp = self.cache_dir / (_RESULTS_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for key, result in zip(self._keys, self._results):
+                f.write(json.dumps({"key": key, "result": result}) + "\n")
+        os.replace(tmp, self.cache_dir / _RESULTS_FILE)
+        self._dirty = False
+
+    @classmethod
+    def load(
+        cls,
+        cache_dir: Path,
+        dim: int = DEFAULT_DIM,
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> "SemanticCache":
+        """Load a cache from disk; missing or unreadable files give an empty cache."""
+        cache = cls(dim=dim, threshold=threshold, cache_dir=cache_dir)
+        try:
+            vectors = np.load(Path(cache_dir) / _EMBEDDINGS_FILE)
+            with open(Path(cache_dir) / _RESULTS_FILE, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        except Exception:
+            return cache
+        if vectors.ndim != 2 or vectors.shape[0] != len(rows) or vectors.shape[1] != dim:
+            return cache
+        cache._buf = np.ascontiguousarray(vectors, dtype=np.float32)
+        if cache._index is not None:
+            cache._index.add(cache._buf)
+        cache._keys = [r.get("key") for r in rows]
+        cache._results = [r["result"] for r in rows]
+        for i, key in enumerate(cache._keys):
+            cache._rows_by_key.setdefault(key, []).append(i)
+        return cache
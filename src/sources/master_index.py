@@ -1,70 +1,143 @@
-import os
-import tempfile
+import asyncio
 from datetime import datetime, timedelta
+from io import StringIO
+from typing import List, Optional, Tuple
 
-import os
+import httpx
 import pandas as pd
-import requests
-from datetime import datetime, timedelta
-from io import StringIO
 
-from typing import Optional
+from src.utils.sec_client import sec_async_client
 
-def get_recent_8k_filings(days_ago: int = 1, base_date_str: Optional[str] = None, user_agent: str = "Mozilla/5.0"):
-    """Fetches the master index file from the SEC for a specific day and parses 8-K filings."""
-    # SEC doesn't publish on weekends, so we search backwards to find the last business day.
+DAILY_INDEX_URL = "https://www.sec.gov/Archives/edgar/daily-index"
+
+# SEC allows 10 req/s; the whole lookback window is probed at once, so cap in-flight requests
+MAX_CONCURRENT_PROBES = 5
+MAX_RETRIES = 3
+
+
+def _daily_index_url(day: datetime) -> str:
+    quarter = (day.month - 1) // 3 + 1
+    return f"{DAILY_INDEX_URL}/{day.year}/QTR{quarter}/master.{day.strftime('%Y%m%d')}.idx"
+
+
+def _candidate_days(base_date: datetime, days_ago: int, window: int = 10) -> List[datetime]:
+    """Business days in the lookback window, most recent first."""
+    days = (base_date - timedelta(days=i) for i in range(days_ago, days_ago + window))
+    # SEC doesn't publish on weekends
+    return [d for d in days if d.weekday() < 5]
+
+
+async def _fetch_index(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    day: datetime,
+) -> Tuple[datetime, Optional[str]]:
+    """Download one daily master index. Returns (day, text) or (day, None) if unavailable."""
+    url = _daily_index_url(day)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with sem:
+                response = await client.get(url)
+        except httpx.HTTPError as e:
+            print(f"Error fetching index for {day.strftime('%Y-%m-%d')}: {e}")
+            return day, None
+        # Back off exponentially when SEC throttles us
+        if response.status_code == 429 and attempt < MAX_RETRIES:
+            await asyncio.sleep(2 ** attempt)
+            continue
+        if response.status_code == 200:
+            return day, response.text
+        return day, None
+    return day, None
+
+
+_INDEX_COLUMNS = ['cik', 'company', 'form_type', 'date_filed', 'file_name']
+
+
+def _parse_master_index(text: str, form_type: str = '8-K') -> pd.DataFrame:
+    """Parse a master.idx body into a DataFrame of `form_type` filings (empty if none)."""
+    # The master.idx file has a free-text header; the data starts after a line of dashes.
+    header = text.find('CIK|Company Name|Form Type|Date Filed|File Name')
+    if header == -1:
+        print("Could not find the start of the data in the index file.")
+        return pd.DataFrame()
+    dashes = text.find('\n', text.find('---', header))
+    if dashes == -1:
+        return pd.DataFrame()
+
+    # Most rows are other forms; drop them with a substring test
+    # before any tokenizing ('|8-K|' does not match '|8-K/A|')
+    needle = f'|{form_type}|'
+    rows = '\n'.join(line for line in text[dashes + 1:].splitlines() if needle in line)
+    if not rows:
+        return pd.DataFrame()
+
+    # One pass of the C parser over the kept rows; strings only, so CIKs and dates are not coerced
+    df = pd.read_csv(
+        StringIO(rows),
+        sep='|',
+        names=_INDEX_COLUMNS,
+        dtype=str,
+        engine='c',
+        on_bad_lines='skip',
+    )
+
+    df_8k = df[df['form_type'].str.strip() == form_type].copy()
+    if df_8k.empty:
+        return df_8k
+
+    df_8k['accession_number'] = df_8k['file_name'].str.rsplit('/', n=1).str[-1].str.replace('.txt', '', regex=False)
+    df_8k['formatted_date_filed'] = pd.to_datetime(df_8k['date_filed'], format='%Y%m%d', errors='coerce').dt.strftime('%Y-%m-%d')
+    return df_8k
+
+
+async def get_recent_8k_filings_async(
+    days_ago: int = 1,
+    base_date_str: Optional[str] = None,
+    user_agent: str = "Mozilla/5.0",
+    *,
+    client: Optional[httpx.AsyncClient] = None,
+) -> pd.DataFrame:
+    """Fetches the most recent daily master index from the SEC and parses its 8-K filings.
+
+    All business days in the lookback window are requested concurrently, so
+    holidays and not-yet-published days cost one round-trip in total instead
+    of one each.
+    """
     if base_date_str:
         base_date = datetime.strptime(base_date_str, '%Y-%m-%d')
     else:
         base_date = datetime.now()
 
-    # SEC doesn't publish on weekends, so we search backwards to find the last business day.
-    for i in range(days_ago, days_ago + 10):
-        current_date = base_date - timedelta(days=i)
-        year = current_date.year
-        quarter = (current_date.month - 1) // 3 + 1
-        date_str = current_date.strftime('%Y%m%d')
-        
-        url = f"https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{quarter}/master.{date_str}.idx"
-        headers = {'User-Agent': user_agent}
-        
-        print(f"Trying to fetch index for {current_date.strftime('%Y-%m-%d')} from {url}")
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            print("Successfully downloaded index file.")
-            # The master.idx file has a header that needs to be skipped.
-            # The actual data starts after a line of dashes '----------'.
-            # We find the start of the data by looking for the header line.
-            lines = response.text.split('\n')
-            start_line = 0
-            for i, line in enumerate(lines):
-                if 'CIK|Company Name|Form Type|Date Filed|File Name' in line:
-                    start_line = i + 1
-                    break
-            
-            if start_line == 0:
-                print("Could not find the start of the data in the index file.")
-                continue
-
-            # Read the data into a pandas DataFrame
-            data = "\n".join(lines[start_line:])
-            df = pd.read_csv(StringIO(data), sep='|', names=['cik', 'company', 'form_type', 'date_filed', 'file_name'])
-            
-            # Filter for 8-K filings
-            df_8k = df[df['form_type'].str.strip() == '8-K'].copy()
-            
-            if df_8k.empty:
-                print(f"No 8-K filings found for {current_date.strftime('%Y-%m-%d')}.")
-                continue
-
-            # Add accession_number from the file_name
-            df_8k['accession_number'] = df_8k['file_name'].apply(lambda x: os.path.basename(x).replace('.txt', ''))
-            df_8k['formatted_date_filed'] = pd.to_datetime(df_8k['date_filed']).dt.strftime('%Y-%m-%d')
-            print(f"Found {len(df_8k)} 8-K filings for {current_date.strftime('%Y-%m-%d')}.")
-            return df_8k
-        else:
-            print(f"No index file found for {current_date.strftime('%Y-%m-%d')}. Trying previous day.")
+    days = _candidate_days(base_date, days_ago)
+    sem = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+    print(f"Trying to fetch daily indexes for {len(days)} business days before {base_date.strftime('%Y-%m-%d')}")
+
+    async def _run(c: httpx.AsyncClient) -> List[Tuple[datetime, Optional[str]]]:
+        return list(await asyncio.gather(*(_fetch_index(c, sem, d) for d in days)))
+
+    if client is not None:
+        results = await _run(client)
+    else:
+        async with sec_async_client(user_agent, timeout=30.0) as c:
+            results = await _run(c)
+
+    # gather keeps input order, i.e. most recent day first
+    for day, text in results:
+        if text is None:
+            print(f"No index file found for {day.strftime('%Y-%m-%d')}. Trying previous day.")
+            continue
+        df_8k = _parse_master_index(text)
+        if df_8k.empty:
+            print(f"No 8-K filings found for {day.strftime('%Y-%m-%d')}.")
+            continue
+        print(f"Found {len(df_8k)} 8-K filings for {day.strftime('%Y-%m-%d')}.")
+        return df_8k
 
     print("Could not find any recent index files.")
     return pd.DataFrame()
+
+
+def get_recent_8k_filings(days_ago: int = 1, base_date_str: Optional[str] = None, user_agent: str = "Mozilla/5.0"):
+    """Blocking wrapper around `get_recent_8k_filings_async`."""
+    return asyncio.run(get_recent_8k_filings_async(days_ago, base_date_str, user_agent))
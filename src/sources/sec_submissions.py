@@ -7,8 +7,13 @@ Fetches recent company submissions JSON and constructs URLs for recent filings.
 We avoid third-party libraries and use the official data.sec.gov endpoint.
 """
 
-from typing import Dict, List, Optional
-import requests
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.sec_client import SESSION, response_json
+
+# Per-process cache of padded CIK -> (ETag, parsed submissions JSON)
+_SUBMISSIONS_CACHE: Dict[str, Tuple[Optional[str], Dict]] = {}
 
 
 def _pad_cik(cik: str) -> str:
@@ -22,14 +27,25 @@ def _pad_cik(cik: str) -> str:
 
 
 def get_company_submissions(cik: str, user_agent: str) -> Optional[Dict]:
-    """Return the JSON submissions for a CIK, or None on error."""
+    """Return the JSON submissions for a CIK, or None on error.
+
+    Responses are cached per CIK; repeat calls revalidate with If-None-Match and
+    reuse the parsed JSON when the SEC answers 304 Not Modified.
+    """
     try:
         pcik = _pad_cik(cik)
         url = f"https://data.sec.gov/submissions/CIK{pcik}.json"
         headers = {"User-Agent": user_agent, "Accept": "application/json"}
-        resp = requests.get(url, headers=headers, timeout=15)
+        etag, cached = _SUBMISSIONS_CACHE.get(pcik, (None, None))
+        if etag and cached is not None:
+            headers["If-None-Match"] = etag
+        resp = SESSION.get(url, headers=headers, timeout=15)
+        if resp.status_code == 304 and cached is not None:
+            return cached
         resp.raise_for_status()
-        return resp.json()
+        data = response_json(resp)
+        _SUBMISSIONS_CACHE[pcik] = (resp.headers.get("ETag"), data)
+        return data
     except Exception as e:
         print(f"[SEC Submissions] Failed to fetch submissions for CIK {cik}: {e}")
         return None
@@ -55,24 +71,26 @@ def get_recent_company_filings(
     dates = filings.get("filingDate", [])
     prims = filings.get("primaryDocument", [])
 
+    # Build the archive base URL once; every filing shares the same CIK directory
+    try:
+        cik_int = int((cik or "").lstrip("0") or "0")
+    except ValueError:
+        return []
+    base_dir = f"https://www.sec.gov/Archives/edgar/data/{cik_int}"
+
+    rows: Iterable[Tuple[str, str, str, str]] = zip(forms, accs, dates, prims)
+    if form_filter:
+        wanted = set(form_filter)
+        rows = (r for r in rows if (r[0] or "").strip() in wanted)
+
     items: List[Dict] = []
-    for form, acc, dt, prim in zip(forms, accs, dates, prims):
-        f = (form or "").strip()
-        if form_filter:
-            if f not in form_filter:
-                continue
-        # Build URLs
-        try:
-            cik_int = int((cik or "").lstrip("0") or "0")
-        except Exception:
-            continue
+    for form, acc, dt, prim in islice(rows, max(limit, 0)):
         acc_nodash = (acc or "").replace("-", "")
-        base_dir = f"https://www.sec.gov/Archives/edgar/data/{cik_int}"
         html_url = f"{base_dir}/{acc_nodash}/{prim}" if prim else None
         txt_url = f"{base_dir}/{acc}.txt" if acc else None
         items.append(
             {
-                "form": f,
+                "form": (form or "").strip(),
                 "filingDate": dt,
                 "accessionNumber": acc,
                 "primaryDoc": prim,
@@ -80,6 +98,4 @@ def get_recent_company_filings(
                 "txt_url": txt_url,
             }
         )
-        if len(items) >= limit:
-            break
     return items
@@ -0,0 +1,26 @@
+"""Generated from src/config/exchanges.csv by `python -m src.utils.exchange_resolver`; do not edit."""
+
+ALIAS_TO_MIC = {
+    'NASDAQ': 'XNAS',
+    'NYSE': 'XNYS',
+    'NYSE AMERICAN': 'XASE',
+    'NYSE MKT': 'XASE',
+    'NYSE ARCA': 'ARCX',
+    'CBOE BZX': 'BATS',
+    'CBOE BYX': 'BATY',
+    'CBOE EDGX': 'EDGX',
+    'CBOE EDGA': 'EDGA',
+    'OTC': 'OTCM',
+}
+
+MIC_TO_NAME = {
+    'XNAS': 'NASDAQ',
+    'XNYS': 'NYSE',
+    'XASE': 'NYSE AMERICAN',
+    'ARCX': 'NYSE ARCA',
+    'BATS': 'CBOE BZX',
+    'BATY': 'CBOE BYX',
+    'EDGX': 'CBOE EDGX',
+    'EDGA': 'CBOE EDGA',
+    'OTCM': 'OTC',
+}
@@ -1,8 +1,52 @@
 import requests
 import json
+import os
+import pickle
 import re
+import sys
 from dataclasses import dataclass
-from typing import Dict, Optional, List, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, List, Sequence, Tuple
+
+import pandas as pd
+
+from src.utils.sec_client import SESSION, response_json
+
+# Optional import; ijson parses the exchange file incrementally while it downloads
+try:
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover
+    ijson = None  # type: ignore
+
+_JSON_ERRORS: Tuple[type, ...] = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+
+def _validator(response: requests.Response) -> Optional[str]:
+    """Cache validator for an SEC file: its ETag, else its Last-Modified date."""
+    return response.headers.get('ETag') or response.headers.get('Last-Modified')
+
+
+def _iter_table_rows(stream: Any) -> Iterator[Tuple[List[str], List[object]]]:
+    """
+    Incrementally parse a {"fields": [...], "data": [[...], ...]} JSON stream.
+
+    Yields (fields, row) per data row without materializing the whole document;
+    SEC lists "fields" before "data", so fields are complete by the first row.
+    """
+    fields: List[str] = []
+    row: Optional[List[object]] = None
+    for prefix, event, value in ijson.parse(stream):
+        if prefix == 'fields.item':
+            fields.append(value)
+        elif prefix == 'data.item':
+            if event == 'start_array':
+                row = []
+            elif event == 'end_array' and row is not None:
+                yield fields, row
+                row = None
+        elif prefix == 'data.item.item' and row is not None:
+            row.append(value)
+
 
 @dataclass(frozen=True)
 class SecurityRecord:
@@ -24,41 +68,103 @@ class CIKMapper:
     """
     _CIK_TICKER_URL = "https://www.sec.gov/files/company_tickers.json"
     _CIK_EXCHANGE_URL = "https://www.sec.gov/files/company_tickers_exchange.json"
-    # Cache of CIK -> list of securities (ticker, title, exchange)
-    _securities_by_cik: Optional[Dict[str, List[SecurityRecord]]] = None
-    # Cache of (CIK, TICKER) -> exchange for precise lookup
-    _exchange_by_cik_ticker: Optional[Dict[Tuple[str, str], str]] = None
+    _CACHE_FILE = "securities.pkl"
 
-    def __init__(self, user_agent: str):
+    def __init__(self, user_agent: str, cache_dir: Optional[Path] = None):
         """
         Initializes the CIKMapper with the required User-Agent.
 
         Args:
             user_agent: The User-Agent string for SEC requests.
+            cache_dir: Directory for the parsed-map cache; defaults to CIK_MAPPER_CACHE_DIR.
+                No on-disk cache is used when neither is set.
         """
         self.user_agent = user_agent
+        # Cache of CIK -> list of securities (ticker, title, exchange)
+        self._securities_by_cik: Optional[Dict[str, Tuple[SecurityRecord, ...]]] = None
+        # Cache of (CIK, TICKER) -> exchange for precise lookup
+        self._exchange_by_cik_ticker: Optional[Dict[Tuple[str, str], str]] = None
+        # CIK -> primary ticker / its exchange, precomputed once the maps are built
+        self._primary_ticker_by_cik: Optional[Dict[str, str]] = None
+        self._primary_exchange_by_cik: Optional[Dict[str, str]] = None
+        cache_dir = cache_dir or os.getenv("CIK_MAPPER_CACHE_DIR")
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+
+    def _load_cached_maps(self) -> bool:
+        """
+        Loads the parsed maps from disk if both SEC files are unchanged since they were cached.
+
+        Each file is revalidated with a HEAD request against its stored ETag/Last-Modified,
+        so a warm start costs two tiny requests instead of two multi-MB downloads.
+        """
+        if self.cache_dir is None:
+            return False
+        try:
+            with open(self.cache_dir / self._CACHE_FILE, 'rb') as f:
+                payload = pickle.load(f)
+            validators = payload['validators']
+            for url in (self._CIK_TICKER_URL, self._CIK_EXCHANGE_URL):
+                response = SESSION.head(url, headers={'User-Agent': self.user_agent}, timeout=10)
+                if not validators.get(url) or _validator(response) != validators[url]:
+                    return False
+            (
+                self._securities_by_cik,
+                self._exchange_by_cik_ticker,
+                self._primary_ticker_by_cik,
+                self._primary_exchange_by_cik,
+            ) = payload['maps']
+        except FileNotFoundError:
+            return False
+        except (requests.RequestException, pickle.UnpicklingError, EOFError, KeyError, TypeError, ValueError) as e:
+            print(f"[CIK Mapper] Ignoring on-disk cache: {e}")
+            return False
+        print("CIK to Securities mapping loaded from cache.")
+        return True
+
+    def _save_cached_maps(self, validators: Dict[str, Optional[str]]) -> None:
+        """Atomically writes the parsed maps and their SEC validators to the cache dir."""
+        if self.cache_dir is None or not all(validators.get(u) for u in (self._CIK_TICKER_URL, self._CIK_EXCHANGE_URL)):
+            return
+        maps = (
+            self._securities_by_cik,
+            self._exchange_by_cik_ticker,
+            self._primary_ticker_by_cik,
+            self._primary_exchange_by_cik,
+        )
+        payload = {'validators': validators, 'maps': maps}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / (self._CACHE_FILE + '.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(payload, f, protocol=5)
+            os.replace(tmp, self.cache_dir / self._CACHE_FILE)
+        except OSError as e:
+            print(f"[CIK Mapper] Could not write on-disk cache: {e}")
 
     def _initialize_map(self) -> None:
         """
         Downloads and processes SEC mapping files to build a per-CIK list of securities
         and a precise (CIK, TICKER) -> exchange map.
         """
-        if self._securities_by_cik is not None and self._exchange_by_cik_ticker is not None:
+        if self._securities_by_cik is not None and self._primary_ticker_by_cik is not None:
+            return
+        if self._load_cached_maps():
             return
 
         print("Initializing CIK to Securities mapping...")
+        validators: Dict[str, Optional[str]] = {}
         securities_by_cik: Dict[str, Dict[str, SecurityRecord]] = {}
         exchange_by_cik_ticker: Dict[Tuple[str, str], str] = {}
         fallback_exchange_by_cik: Dict[str, str] = {}
 
         # 1) Load company_tickers.json -> base securities (no exchange info here)
         try:
-            response = requests.get(self._CIK_TICKER_URL, headers={'User-Agent': self.user_agent})
+            response = SESSION.get(self._CIK_TICKER_URL, headers={'User-Agent': self.user_agent})
             response.raise_for_status()
-            data = response.json()
+            data = response_json(response)
             for item in data.values():
                 cik_key = str(item.get('cik_str'))
-                ticker = str(item.get('ticker', '')).upper()
+                ticker = sys.intern(str(item.get('ticker', '')).upper())
                 title = str(item.get('title', '')).strip()
                 if not cik_key or not ticker:
                     continue
@@ -67,35 +173,51 @@ class CIKMapper:
                 # De-dupe by ticker within CIK
                 if ticker not in securities_by_cik[cik_key]:
                     securities_by_cik[cik_key][ticker] = SecurityRecord(ticker=ticker, title=title, exchange=None)
+            validators[self._CIK_TICKER_URL] = _validator(response)
             print("CIK to Securities (base) mapping initialized successfully.")
         except (requests.RequestException, json.JSONDecodeError) as e:
             print(f"[CIK Mapper Error] Failed to download/parse tickers file: {e}")
 
         # 2) Load company_tickers_exchange.json -> exchange info; try to map per (cik, ticker)
         try:
-            response = requests.get(self._CIK_EXCHANGE_URL, headers={'User-Agent': self.user_agent})
-            response.raise_for_status()
-            data = response.json()
-            fields: List[str] = data.get('fields', [])
-            rows: List[List[object]] = data.get('data', [])
-            cik_index = fields.index('cik')
-            exchange_index = fields.index('exchange')
-            ticker_index = fields.index('ticker') if 'ticker' in fields else None
-
-            for row in rows:
-                cik_val = str(row[cik_index])
-                cik_key = str(int(cik_val))  # normalize to non-padded
-                exchange_val = str(row[exchange_index]).strip() if row[exchange_index] is not None else ''
-                if ticker_index is not None:
-                    ticker_val = str(row[ticker_index]).upper() if row[ticker_index] is not None else ''
-                    if cik_key and ticker_val:
-                        exchange_by_cik_ticker[(cik_key, ticker_val)] = exchange_val
+            response = SESSION.get(self._CIK_EXCHANGE_URL, headers={'User-Agent': self.user_agent}, stream=True)
+            try:
+                response.raise_for_status()
+                if ijson is not None:
+                    response.raw.decode_content = True
+                    rows = _iter_table_rows(response.raw)
                 else:
-                    # Fallback: only per-CIK exchange available
-                    if cik_key:
-                        fallback_exchange_by_cik[cik_key] = exchange_val
+                    data = response_json(response)
+                    rows = ((data.get('fields', []), row) for row in data.get('data', []))
+
+                indices: Optional[Tuple[int, int, Optional[int]]] = None
+                for fields, row in rows:
+                    if indices is None:
+                        indices = (
+                            fields.index('cik'),
+                            fields.index('exchange'),
+                            fields.index('ticker') if 'ticker' in fields else None,
+                        )
+                    cik_index, exchange_index, ticker_index = indices
+                    cik_val = str(row[cik_index])
+                    cik_key = str(int(cik_val))  # normalize to non-padded
+                    # A dozen exchange names repeat across ~10k rows; intern them (and tickers)
+                    # so every record shares one string object per distinct value
+                    exchange_val = sys.intern(str(row[exchange_index]).strip()) if row[exchange_index] is not None else ''
+                    if ticker_index is not None:
+                        ticker_val = sys.intern(str(row[ticker_index]).upper()) if row[ticker_index] is not None else ''
+                        if cik_key and ticker_val:
+                            exchange_by_cik_ticker[(cik_key, ticker_val)] = exchange_val
+                    else:
+                        # Fallback: only per-CIK exchange available
+                        if cik_key:
+                            fallback_exchange_by_cik[cik_key] = exchange_val
+                # Only a fully parsed file is worth caching
+                validators[self._CIK_EXCHANGE_URL] = _validator(response)
+            finally:
+                response.close()
             print("CIK/Ticker to Exchange mapping initialized successfully.")
-        except (requests.RequestException, json.JSONDecodeError, ValueError, KeyError) as e:
+        except (requests.RequestException, ValueError, KeyError) + _JSON_ERRORS as e:
             print(f"[CIK Mapper Error] Failed to initialize exchange map: {e}")
 
         # 3) Join exchange info into securities
@@ -106,9 +228,63 @@ class CIKMapper:
                     ticker_map[tkr] = SecurityRecord(ticker=sec.ticker, title=sec.title, exchange=exch)
 
         # Freeze caches
-        self._securities_by_cik = {cik: list(tmap.values()) for cik, tmap in securities_by_cik.items()}
+        # Tuples: immutable, so lookups can hand them out without a defensive copy
+        self._securities_by_cik = {cik: tuple(tmap.values()) for cik, tmap in securities_by_cik.items()}
         self._exchange_by_cik_ticker = exchange_by_cik_ticker
+        self._build_primary_indexes()
+        self._add_padded_keys()
         print("CIK to Securities mapping ready (with exchanges where available).")
+        self._save_cached_maps(validators)
+
+    def _build_primary_indexes(self) -> None:
+        """
+        Scores every CIK's securities once so primary ticker/exchange lookups are dict reads.
+        The maps are never mutated after loading, so no invalidation is needed.
+        """
+        primary_ticker_by_cik: Dict[str, str] = {}
+        primary_exchange_by_cik: Dict[str, str] = {}
+        for cik_key, securities in (self._securities_by_cik or {}).items():
+            ticker = self._compute_primary(securities)
+            if not ticker:
+                continue
+            primary_ticker_by_cik[cik_key] = ticker
+            exch = (self._exchange_by_cik_ticker or {}).get((cik_key, ticker.upper())) or next(
+                (sec.exchange for sec in securities if sec.ticker.upper() == ticker.upper() and sec.exchange),
+                None,
+            )
+            if exch:
+                primary_exchange_by_cik[cik_key] = exch
+        self._primary_ticker_by_cik = primary_ticker_by_cik
+        self._primary_exchange_by_cik = primary_exchange_by_cik
+
+    def _add_padded_keys(self) -> None:
+        """
+        Aliases every CIK-keyed entry under its 10-digit zero-padded form as well.
+
+        Filing headers carry padded CIKs while the SEC maps use unpadded ones; with
+        both keys present, lookups are a single dict get with no int/str conversion.
+        Aliased keys share the same value objects, so the extra cost is the keys.
+        """
+        for table in (self._securities_by_cik, self._primary_ticker_by_cik, self._primary_exchange_by_cik):
+            for cik_key, value in list(table.items()):
+                table.setdefault(cik_key.zfill(10), value)
+        exchanges = self._exchange_by_cik_ticker
+        for (cik_key, ticker), exch in list(exchanges.items()):
+            exchanges.setdefault((cik_key.zfill(10), ticker), exch)
+
+    @staticmethod
+    def _cik_key(cik: str) -> str:
+        try:
+            return str(int(cik))  # normalize to non-padded
+        except ValueError:
+            return cik
+
+    def _get_by_cik(self, table: Optional[Dict[str, Any]], cik: str) -> Any:
+        """Direct lookup; only unusual spellings (whitespace, odd padding) pay for normalization."""
+        if not table:
+            return None
+        value = table.get(cik)
+        return value if value is not None else table.get(self._cik_key(cik))
 
     def get_ticker_by_cik(self, cik: str) -> Optional[str]:
         """
@@ -127,36 +303,48 @@ class CIKMapper:
         securities = self.get_securities_by_cik(cik)
         return [s.ticker for s in securities]
 
-    def get_securities_by_cik(self, cik: str) -> List[SecurityRecord]:
-        """Returns all known SecurityRecord entries for a given CIK."""
+    def get_securities_by_cik(self, cik: str) -> Sequence[SecurityRecord]:
+        """Returns all known SecurityRecord entries for a given CIK (shared, read-only)."""
         if self._securities_by_cik is None:
             self._initialize_map()
-        try:
-            cik_key = str(int(cik))
-        except ValueError:
-            cik_key = cik
-        return list(self._securities_by_cik.get(cik_key, [])) if self._securities_by_cik else []
+        return self._get_by_cik(self._securities_by_cik, cik) or ()
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the primary ticker and exchange of every CIK as a DataFrame
+        with columns cik (unpadded), ticker and exchange, for bulk joins.
+        """
+        if self._primary_ticker_by_cik is None:
+            self._initialize_map()
+        tickers = self._primary_ticker_by_cik or {}
+        exchanges = self._primary_exchange_by_cik or {}
+        # Skip the zero-padded aliases; each CIK appears once
+        ciks = [c for c in tickers if not c.startswith('0')]
+        return pd.DataFrame({
+            'cik': ciks,
+            'ticker': [tickers[c] for c in ciks],
+            'exchange': [exchanges.get(c) for c in ciks],
+        })
 
     def get_exchange(self, cik: str, ticker: str) -> Optional[str]:
         """Returns the exchange for a given (CIK, ticker) if available."""
         if self._exchange_by_cik_ticker is None:
             self._initialize_map()
-        try:
-            cik_key = str(int(cik))
-        except ValueError:
-            cik_key = cik
         # Try precise map first
         if self._exchange_by_cik_ticker:
-            exch = self._exchange_by_cik_ticker.get((cik_key, ticker.upper()))
+            tkr = ticker.upper()
+            exch = self._exchange_by_cik_ticker.get((cik, tkr)) or self._exchange_by_cik_ticker.get((self._cik_key(cik), tkr))
             if exch:
                 return exch
         # Fallback: infer from stored securities
-        for sec in self.get_securities_by_cik(cik_key):
+        for sec in self.get_securities_by_cik(cik):
             if sec.ticker.upper() == ticker.upper() and sec.exchange:
                 return sec.exchange
         return None
 
     # -------- Heuristics for primary ticker selection --------
+    # Substring hints are fused into one alternation each, so scoring a security
+    # is a single regex search per attribute instead of a Python loop.
     _PRIMARY_EXCH_HINTS = (
         "NASDAQ",
         "NYSE",
@@ -164,6 +352,7 @@ class CIKMapper:
         "NYSEMKT",
         "NYSE ARCA",
     )
+    _PRIMARY_EXCH_RE = re.compile("|".join(map(re.escape, _PRIMARY_EXCH_HINTS)))
 
     _TITLE_DEPRIORITIZE = (
         "PREFERRED",
@@ -174,29 +363,20 @@ class CIKMapper:
         "BOND",
         "CONVERTIBLE",
     )
+    _TITLE_DEPRIORITIZE_RE = re.compile("|".join(map(re.escape, _TITLE_DEPRIORITIZE)))
 
-    _HEAVY_SUFFIX_PATTERNS = (
-        re.compile(r"-P[A-Z]*$"),  # preferred series
-        re.compile(r"-(WS|W)$"),   # warrants
-        re.compile(r"-U$"),       # units
-        re.compile(r"-R$"),       # rights
-        re.compile(r"-N$"),       # notes/other series
-    )
-
-    _MILD_SUFFIX_PATTERNS = (
-        re.compile(r"-(B|C)$"),   # class B/C common (dual-class)
-        re.compile(r"\.[A-Z]$"), # dot-suffixed classes like BRK.A
-    )
+    # preferred series (-P*), warrants (-WS/-W), units (-U), rights (-R), notes/other series (-N)
+    _HEAVY_SUFFIX_RE = re.compile(r"-(?:P[A-Z]*|WS|W|U|R|N)$")
+    # class B/C common (dual-class), dot-suffixed classes like BRK.A
+    _MILD_SUFFIX_RE = re.compile(r"-(?:B|C)$|\.[A-Z]$")
 
     def _is_primary_exchange(self, exchange: Optional[str]) -> bool:
         if not exchange:
             return False
-        ex = exchange.upper()
-        return any(hint in ex for hint in self._PRIMARY_EXCH_HINTS)
+        return self._PRIMARY_EXCH_RE.search(exchange.upper()) is not None
 
     def _title_penalty(self, title: str) -> int:
-        t = title.upper()
-        return 1 if any(k in t for k in self._TITLE_DEPRIORITIZE) else 0
+        return 1 if self._TITLE_DEPRIORITIZE_RE.search(title.upper()) else 0
 
     def _suffix_penalties(self, ticker: str) -> Tuple[int, int, int]:
         """
@@ -204,41 +384,49 @@ class CIKMapper:
         (heavy_suffix_penalty, mild_suffix_penalty, has_symbol_penalty)
         """
         t = ticker.upper()
-        heavy = 1 if any(p.search(t) for p in self._HEAVY_SUFFIX_PATTERNS) else 0
-        mild = 1 if any(p.search(t) for p in self._MILD_SUFFIX_PATTERNS) else 0
+        heavy = 1 if self._HEAVY_SUFFIX_RE.search(t) else 0
+        mild = 1 if self._MILD_SUFFIX_RE.search(t) else 0
         has_symbol = 1 if ("-" in t or "." in t) else 0
         return heavy, mild, has_symbol
 
     def get_primary_ticker_by_cik(self, cik: str) -> Optional[str]:
         """
-        Selects a single primary ticker for the given CIK using heuristics:
+        Returns the primary ticker for the given CIK, precomputed by `_compute_primary`.
+        """
+        if self._primary_ticker_by_cik is None:
+            self._initialize_map()
+        return self._get_by_cik(self._primary_ticker_by_cik, cik)
+
+    def _security_score(self, sec: SecurityRecord) -> Tuple[int, int, int, int, int, int, str]:
+        """Ranking key for primary ticker selection; lower tuple is better."""
+        title_pen = self._title_penalty(sec.title)
+        heavy, mild, has_sym = self._suffix_penalties(sec.ticker)
+        non_primary_exch = 0 if self._is_primary_exchange(sec.exchange) else 1
+        return (
+            title_pen,
+            heavy,
+            non_primary_exch,
+            mild,
+            has_sym,
+            len(sec.ticker),
+            sec.ticker,
+        )
+
+    def _compute_primary(self, securities: Sequence[SecurityRecord]) -> Optional[str]:
+        """
+        Selects a single primary ticker among a CIK's securities using heuristics:
         - Prefer titles without preferred/depositary/units/warrants/notes/bond/convertible.
         - Prefer tickers without heavy suffix patterns (-P*, -WS/-W, -U, -R, -N).
         - Prefer primary exchanges (NYSE/NASDAQ family) over OTC/unknown.
         - Deprioritize mild class suffixes (.-class, -B/-C), but allow if needed.
         - Break ties by shorter ticker, then alphabetical for determinism.
+
+        Runs once per CIK at map-build time (see `_build_primary_indexes`), so each
+        security is scored exactly once per load.
         """
-        securities = self.get_securities_by_cik(cik)
         if not securities:
             return None
-
-        def score(sec: SecurityRecord) -> Tuple[int, int, int, int, int, int, str]:
-            title_pen = self._title_penalty(sec.title)
-            heavy, mild, has_sym = self._suffix_penalties(sec.ticker)
-            non_primary_exch = 0 if self._is_primary_exchange(sec.exchange) else 1
-            # Lower tuple is better
-            return (
-                title_pen,
-                heavy,
-                non_primary_exch,
-                mild,
-                has_sym,
-                len(sec.ticker),
-                sec.ticker,
-            )
-
-        best = min(securities, key=score)
-        return best.ticker if best else None
+        return min(securities, key=self._security_score).ticker
 
     def get_exchange_by_cik(self, cik: str) -> Optional[str]:
         """
@@ -250,7 +438,17 @@ class CIKMapper:
         Returns:
             The exchange, or None if not found.
         """
-        primary = self.get_primary_ticker_by_cik(cik)
-        if not primary:
-            return None
-        return self.get_exchange(cik, primary)
+        if self._primary_exchange_by_cik is None:
+            self._initialize_map()
+        return self._get_by_cik(self._primary_exchange_by_cik, cik)
+
+
+_INSTANCE: Optional[CIKMapper] = None
+
+
+def get_cik_mapper(user_agent: str) -> CIKMapper:
+    """Returns the process-wide CIKMapper, so the SEC maps are loaded at most once."""
+    global _INSTANCE
+    if _INSTANCE is None:
+        _INSTANCE = CIKMapper(user_agent=user_agent)
+    return _INSTANCE
@@ -1,10 +1,84 @@
 from __future__ import annotations
 
+"""
+Exchange alias -> ISO 10383 MIC resolution.
+
+The bundled table (src/config/exchanges.csv) is compiled into the
+`_exchange_data` module as dict literals, so the default resolver is ready at
+import time without opening or parsing the CSV. After editing the CSV,
+regenerate it from the project root:
+
+  python -m src.utils.exchange_resolver
+"""
+
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Mapping, Optional, Tuple
+import csv
+import functools
 import threading
 
-import pandas as pd
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
+# Generated from exchanges.csv and committed. The fallback (read the CSV instead) keeps
+# this module importable if the generated file is deleted or broken by a bad edit, so
+# `python -m src.utils.exchange_resolver` can still regenerate it.
+try:
+    from src.utils import _exchange_data  # type: ignore
+except Exception:  # pragma: no cover
+    _exchange_data = None  # type: ignore
+
+DEFAULT_CSV_PATH = Path(__file__).resolve().parents[1] / "config" / "exchanges.csv"
+_GENERATED_PATH = Path(__file__).resolve().with_name("_exchange_data.py")
+
+
+@functools.lru_cache(maxsize=256)
+def _normalize(key: str) -> str:
+    # Callers pass a handful of distinct exchange strings, so cache the normalized key
+    return key.strip().upper()
+
+
+def read_exchange_csv(csv_path: Path) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Parse an exchanges CSV into (alias -> MIC, MIC -> display name) maps.
+
+    Missing or unreadable files give empty maps; lookups then fall back gracefully.
+    """
+    alias_to_mic: Dict[str, str] = {}
+    mic_to_name: Dict[str, str] = {}
+    # The file is tiny; the stdlib reader avoids importing pandas just to parse it
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    except Exception:
+        return alias_to_mic, mic_to_name
+
+    for row in rows:
+        alias = (row.get("alias") or "").strip().upper()
+        mic = (row.get("mic") or "").strip().upper()
+        display = (row.get("display_name") or "").strip()
+        if alias and mic:
+            alias_to_mic[alias] = mic
+        if mic and display and mic not in mic_to_name:
+            mic_to_name[mic] = display
+    return alias_to_mic, mic_to_name
+
+
+def render_exchange_data(csv_path: Path = DEFAULT_CSV_PATH) -> str:
+    """Source of the `_exchange_data` module for the given CSV."""
+    alias_to_mic, mic_to_name = read_exchange_csv(csv_path)
+
+    def _dict_literal(name: str, mapping: Dict[str, str]) -> str:
+        items = "".join(f"    {k!r}: {v!r},\n" for k, v in mapping.items())
+        return f"{name} = {{\n{items}}}\n"
+
+    return (
+        '"""Generated from src/config/exchanges.csv by `python -m src.utils.exchange_resolver`; do not edit."""\n'
+        "\n"
+        + _dict_literal("ALIAS_TO_MIC", alias_to_mic)
+        + "\n"
+        + _dict_literal("MIC_TO_NAME", mic_to_name)
+    )
 
 
 class ExchangeResolver:
@@ -16,65 +90,62 @@ class ExchangeResolver:
     - display_name: human-friendly display name (e.g., 'NASDAQ', 'NYSE ARCA')
     """
 
-    def __init__(self, csv_path: Path) -> None:
-        self._csv_path = csv_path
+    def __init__(self, csv_path: Optional[Path] = None) -> None:
+        """
+        Args:
+            csv_path: CSV to load. None uses the bundled table, from the generated
+                `_exchange_data` module when present, else from the default CSV.
+        """
+        self._csv_path = csv_path or DEFAULT_CSV_PATH
         self._alias_to_mic: Dict[str, str] = {}
         self._mic_to_name: Dict[str, str] = {}
-        self._loaded: bool = False
-        self._lock = threading.Lock()
-
-    def _ensure_loaded(self) -> None:
-        if self._loaded:
-            return
-        with self._lock:
-            if self._loaded:
-                return
+        if csv_path is None and _exchange_data is not None:
+            self._alias_to_mic = dict(_exchange_data.ALIAS_TO_MIC)
+            self._mic_to_name = dict(_exchange_data.MIC_TO_NAME)
+        else:
+            # The file is tiny, so load eagerly: lookups are then plain dict reads with no lock
             self._load()
-            self._loaded = True
 
     def _load(self) -> None:
-        self._alias_to_mic.clear()
-        self._mic_to_name.clear()
-        try:
-            df = pd.read_csv(self._csv_path, dtype=str).fillna("")
-        except Exception:
-            # Missing or unreadable file: leave maps empty; lookups will fall back gracefully
-            return
-
-        for _, row in df.iterrows():
-            alias = str(row.get("alias", "")).strip().upper()
-            mic = str(row.get("mic", "")).strip().upper()
-            display = str(row.get("display_name", "")).strip()
-            if alias and mic:
-                self._alias_to_mic[alias] = mic
-            if mic and display and mic not in self._mic_to_name:
-                self._mic_to_name[mic] = display
+        self._alias_to_mic, self._mic_to_name = read_exchange_csv(self._csv_path)
+
+    @property
+    def alias_to_mic(self) -> Mapping[str, str]:
+        """Read-only view of the upper-cased alias -> MIC map, for vectorized lookups."""
+        return MappingProxyType(self._alias_to_mic)
 
     def to_mic(self, exchange_name: Optional[str]) -> Optional[str]:
         if not exchange_name:
             return None
-        self._ensure_loaded()
-        key = exchange_name.strip().upper()
-        return self._alias_to_mic.get(key)
+        return self._alias_to_mic.get(_normalize(exchange_name))
+
+    def to_mic_series(self, exchange_names: "pd.Series") -> "pd.Series":
+        """Vectorized `to_mic` over a column of exchange names (missing -> NaN)."""
+        return exchange_names.astype("string").str.strip().str.upper().map(self._alias_to_mic)
 
     def mic_to_name(self, mic: Optional[str]) -> Optional[str]:
         if not mic:
             return None
-        self._ensure_loaded()
-        key = mic.strip().upper()
+        key = _normalize(mic)
         # If not found, return the MIC itself so callers see something reasonable
         return self._mic_to_name.get(key, key)
 
 
 # Module-level singleton
 _RESOLVER: Optional[ExchangeResolver] = None
+_RESOLVER_LOCK = threading.Lock()
 
 
 def get_exchange_resolver() -> ExchangeResolver:
     global _RESOLVER
     if _RESOLVER is None:
-        # Compute default path: src/utils -> src/config/exchanges.csv
-        base_src = Path(__file__).resolve().parents[1]
-        csv_path = base_src / "config" / "exchanges.csv"
-        _RESOLVER = ExchangeResolver(csv_path)
+        # Guard construction (and thus the one-time load) against concurrent first calls
+        with _RESOLVER_LOCK:
+            if _RESOLVER is None:
+                _RESOLVER = ExchangeResolver()
     return _RESOLVER
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _GENERATED_PATH.write_text(render_exchange_data(), encoding="utf-8")
+    print(f"Wrote {_GENERATED_PATH}")
@@ -1,11 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+import codecs
+import functools
 import re
 import requests
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.utils.sec_client import DEFAULT_TIMEOUT, SESSION
+
+# One alternation finds the primary HTML file name from various patterns in a single scan
+# e.g., <FILENAME>my-document.htm, instance="my-document.htm", etc.
+_FILENAME_PATTERN = re.compile(
+    r'<FILENAME>(?P<fn>.*\.htm[l]?)'
+    r'|instance="(?P<inst>[^"]+\.htm[l]?)"'
+    r'|original="(?P<orig>[^"]+\.htm[l]?)"'
+    r'|"baseRef":\s*"(?P<base>[^"]+\.htm[l]?)"',
+    re.IGNORECASE,
+)
+# Group names in priority order: a <FILENAME> match anywhere beats an earlier instance=...
+_FILENAME_PRIORITY = ('fn', 'inst', 'orig', 'base')
+# A more generic fallback if specific patterns fail
+_FALLBACK_PATTERN = re.compile(r'([a-zA-Z0-9_.-]+\.htm[l]?)')
+# The top-priority match; once it is seen the rest of the submission is not needed
+_FILENAME_TAG = re.compile(r'<FILENAME>.*\.htm[l]?', re.IGNORECASE)
+_CHUNK_SIZE = 16384
+_DROP_DASHES = str.maketrans('', '', '-')
+# In-memory bodies are first searched for the tag within this many characters
+_SEARCH_WINDOW = 65536
+# The SGML header and first <DOCUMENT> block fit in the first few KB of a submission
+HEADER_RANGE_BYTES = 32768
+
+
+def _scan_filename_tag(content: str) -> Optional[str]:
+    """Fast path for the usual SEC layout: the first <FILENAME> line names an .htm(l) file."""
+    start = content.find('<FILENAME>')
+    if start == -1:
+        return None
+    start += len('<FILENAME>')
+    end = content.find('\n', start)
+    name = content[start:end if end != -1 else len(content)].rstrip(' \r\t')
+    return name if name.lower().endswith(('.htm', '.html')) else None
+
+
+def _find_html_filename(content: str) -> Optional[str]:
+    """Highest-priority file name match, scanning `content` once (stops at the first <FILENAME>)."""
+    name = _scan_filename_tag(content)
+    if name:
+        return name
+    # Any <FILENAME> match is the answer, and it is normally near the top; the window
+    # ends on a line break so a name cannot be cut short
+    window = content.rfind('\n', 0, _SEARCH_WINDOW)
+    match = _FILENAME_TAG.search(content, 0, window) if window > 0 else None
+    if match:
+        return match.group()[len('<FILENAME>'):]
+    best, best_rank = None, len(_FILENAME_PRIORITY)
+    for match in _FILENAME_PATTERN.finditer(content):
+        rank = _FILENAME_PRIORITY.index(match.lastgroup)
+        if rank < best_rank:
+            best, best_rank = match.group(match.lastgroup), rank
+            if rank == 0:
+                break
+    return best
+
+
+def _read_until_filename(response: requests.Response) -> str:
+    """Read a streamed .txt submission only up to the first complete <FILENAME>...htm line.
+
+    The tag sits in the first <DOCUMENT> header, a few KB into submissions that can
+    be many MB. Without a match the whole body is read, so the lower-priority
+    patterns still see everything.
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    text = ''
+    pos = 0  # text[:pos] holds complete lines that were already scanned
+    for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+        text += decoder.decode(chunk)
+        end = text.rfind('\n')
+        if end < pos:
+            continue
+        if _FILENAME_TAG.search(text, pos, end):
+            return text[:end + 1]
+        pos = end + 1
+    return text + decoder.decode(b'', final=True)
+
+
+def _fetch_submission_text(txt_url: str, headers: Dict[str, str]) -> Tuple[str, bool]:
+    """GET a .txt submission, streamed and read only as far as the <FILENAME> line.
+
+    Returns (text, partial), where partial is True for a 206 (range) response.
+    """
+    with SESSION.get(txt_url, headers=headers, timeout=DEFAULT_TIMEOUT, stream=True) as response:
+        response.raise_for_status()  # Raise an exception for bad status codes
+        partial = response.status_code == 206
+        content = _read_until_filename(response)
+        if partial:
+            # At most one range of data is left; reading it returns the connection to the
+            # pool instead of closing it. A full body is not drained, it can be many MB.
+            response.raw.drain_conn()
+            response.raw.release_conn()
+    if partial:
+        # A range can end mid-line (e.g. inside 'x.html'); keep complete lines only
+        content = content[:content.rfind('\n') + 1]
+    return content, partial
+
+
+def find_html_link(txt_url: str, content: str) -> Optional[str]:
+    """
+    Finds the primary HTML document in already-downloaded .txt filing content.
+
+    Args:
+        txt_url: The URL of the .txt filing.
+        content: The (possibly truncated) text of the .txt filing.
+
+    Returns:
+        The URL of the .html filing, or None if not found.
+    """
+    html_filename = _find_html_filename(content)
+    if html_filename:
+        html_filename = html_filename.strip()
+
+    if not html_filename:
+        match = _FALLBACK_PATTERN.search(content)
+        if match:
+            html_filename = match.group(1).strip()
+
+    if not html_filename:
+        return None
+
+    # Construct the HTML URL:
+    #   txt_url  -> https://.../data/CIK/ACCESSION-NUMBER.txt
+    #   html_url -> https://.../data/CIK/ACCESSIONNUMBER/filename.htm
+    slash = txt_url.rfind('/')
+    end = len(txt_url) - 4 if txt_url.endswith('.txt') else len(txt_url)
+    accession_clean = txt_url[slash + 1:end].translate(_DROP_DASHES)
+    return f"{txt_url[:slash]}/{accession_clean}/{html_filename}"
+
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_cached(txt_url: str, user_agent: str) -> Optional[str]:
+    """Fetch and resolve one .txt link, memoized per (url, user agent).
+
+    A missing file name (None) is cached; errors propagate, so a failed fetch
+    is retried on the next call. Call `_resolve_cached.cache_clear()` to reset.
+    """
+    headers = {'User-Agent': user_agent}
+    # Ask for the header block only; a byte range must not apply to a gzip encoding
+    content, partial = _fetch_submission_text(
+        txt_url,
+        {**headers, 'Range': f'bytes=0-{HEADER_RANGE_BYTES - 1}', 'Accept-Encoding': 'identity'},
+    )
+    if partial and not _FILENAME_TAG.search(content):
+        # The tag was not in the header block; other patterns need the whole submission
+        content, _ = _fetch_submission_text(txt_url, headers)
+    return find_html_link(txt_url, content)
+
 
 def convert_txt_link_to_html(txt_url: str, user_agent: str) -> Optional[str]:
     """
     Converts a .txt SEC filing link to its corresponding .htm/.html link.
 
+    Results are memoized for the process, so re-resolving a link costs no request.
+
     Args:
         txt_url: The URL of the .txt filing.
         user_agent: The User-Agent string for the request.
@@ -14,44 +168,9 @@ def convert_txt_link_to_html(txt_url: str, user_agent: str) -> Optional[str]:
         The URL of the .html filing, or None if not found.
     """
     try:
-        headers = {'User-Agent': user_agent}
-        response = requests.get(txt_url, headers=headers)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        content = response.text
-
-        # Regex to find the primary HTML file name from various patterns
-        # e.g., <FILENAME>my-document.htm, instance="my-document.htm", etc.
-        patterns = [
-            r'<FILENAME>(.*\.htm[l]?)',
-            r'instance="([^"]+\.htm[l]?)"',
-            r'original="([^"]+\.htm[l]?)"',
-            r'"baseRef":\s*"([^"]+\.htm[l]?)"'
-        ]
-        
-        html_filename = None
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                html_filename = match.group(1).strip()
-                break
-
-        if not html_filename:
-            # A more generic fallback if specific patterns fail
-            match = re.search(r'([a-zA-Z0-9_.-]+\.htm[l]?)', content)
-            if match:
-                html_filename = match.group(1).strip()
-
-        if not html_filename:
+        html_url = _resolve_cached(txt_url, user_agent)
+        if not html_url:
             print(f"Could not find HTML filename in {txt_url}")
-            return None
-
-        # Construct the HTML URL:
-        #   txt_url  -> https://.../data/CIK/ACCESSION-NUMBER.txt
-        #   html_url -> https://.../data/CIK/ACCESSIONNUMBER/filename.htm
-        base_path, accession_txt = txt_url.rsplit('/', 1)
-        accession_clean = accession_txt.replace('.txt', '').replace('-', '')
-        html_url = f"{base_path}/{accession_clean}/{html_filename}"
-
         return html_url
 
     except requests.exceptions.RequestException as e:
@@ -60,3 +179,24 @@ def convert_txt_link_to_html(txt_url: str, user_agent: str) -> Optional[str]:
     except Exception as e:
         print(f"An error occurred while processing {txt_url}: {e}")
         return None
+
+
+def convert_many(txt_urls: Sequence[str], user_agent: str, max_workers: int = 4) -> List[Optional[str]]:
+    """
+    Converts several .txt SEC filing links concurrently.
+
+    Requests go through the shared SESSION, whose rate limiter keeps all
+    workers together under SEC's request budget.
+
+    Args:
+        txt_urls: The URLs of the .txt filings.
+        user_agent: The User-Agent string for the requests.
+        max_workers: Number of conversions in flight.
+
+    Returns:
+        One .html URL (or None) per input URL, in input order.
+    """
+    if not txt_urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda url: convert_txt_link_to_html(url, user_agent), txt_urls))
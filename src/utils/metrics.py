@@ -1,12 +1,41 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
-from datetime import datetime
-from typing import Dict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Union
 import json
+import os
+import time
 
+# Optional import; orjson serializes straight to UTF-8 bytes and is several times faster
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
 
-@dataclass
+
+# (epoch second, formatted) of the last timestamp; records are written in bursts
+_last_timestamp = (-1, "")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as 'YYYY-MM-DDTHH:MM:SSZ', formatted at most once per second."""
+    global _last_timestamp
+    sec = time.time_ns() // 1_000_000_000
+    cached_sec, text = _last_timestamp
+    if sec != cached_sec:
+        text = datetime.fromtimestamp(sec, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        _last_timestamp = (sec, text)
+    return text
+
+
+def _jsonl_line(payload: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload) + "\n").encode("utf-8")
+
+
+@dataclass(slots=True)
 class Metrics:
     """Lightweight counters for effective-date enrichment.
 
@@ -20,15 +49,12 @@ class Metrics:
     followup_used: int = 0
 
     def record(self, *, effective_date: bool, had_estimate: bool, promoted: bool, followup_used: bool) -> None:
+        # Flags are bools (0/1), so each counter is a plain add instead of a branch
         self.processed += 1
-        if effective_date:
-            self.definitive += 1
-        if had_estimate and not effective_date:
-            self.estimated += 1
-        if promoted:
-            self.promoted += 1
-        if followup_used:
-            self.followup_used += 1
+        self.definitive += effective_date
+        self.estimated += had_estimate and not effective_date
+        self.promoted += promoted
+        self.followup_used += followup_used
 
     def summary(self) -> Dict[str, float]:
         p = max(self.processed, 1)
@@ -47,11 +73,25 @@ class Metrics:
         print("\n[Metrics] Effective-date enrichment summary:")
         print(json.dumps(s, indent=2))
 
-    def save_jsonl(self, file_path: str) -> None:
+    def save_jsonl(self, file: Union[str, os.PathLike, IO[bytes]]) -> None:
+        """Append one JSON record to `file`, a path or an already-open binary file.
+
+        Pass an open file when saving repeatedly, so it is not reopened per record.
+        """
+        s = self.summary()
         payload = {
-            **asdict(self),
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            **{k: v for k, v in self.summary().items() if k not in {"processed", "definitive", "estimated", "promoted", "followup_used"}},
+            "processed": self.processed,
+            "definitive": self.definitive,
+            "estimated": self.estimated,
+            "promoted": self.promoted,
+            "followup_used": self.followup_used,
+            "timestamp": _utc_timestamp(),
+            "fill_rate": s["fill_rate"],
+            "est_or_def_rate": s["est_or_def_rate"],
         }
-        with open(file_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(payload) + "\n")
+        line = _jsonl_line(payload)
+        if hasattr(file, "write"):
+            file.write(line)
+            return
+        with open(file, "ab") as f:
+            f.write(line)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+"""
+Shared HTTP helpers for SEC requests.
+
+All blocking SEC calls go through one process-wide requests.Session so TCP/TLS
+connections to www.sec.gov and data.sec.gov are kept alive between requests.
+That session and every httpx client built by `sec_async_client` draw from one
+shared rate limiter, so the whole process stays under SEC's 10 requests/second.
+
+Most of the pipeline only needs the beginning of a filing (header, cover page,
+first items), so bodies are read up to a byte cap instead of downloading and
+decoding multi-MB submissions that are mostly thrown away later.
+"""
+
+from typing import Any, Optional
+import asyncio
+import json
+import os
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional import; orjson decodes large SEC JSON payloads several times faster
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+class RateLimiter:
+    """Evenly spaces requests to at most `rate` per second, across threads and event loops.
+
+    Each caller reserves the next free slot under a lock and then sleeps until it,
+    so sync (`acquire`) and async (`acquire_async`) callers share one budget.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+            return slot - now
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+SEC_RATE_LIMITER = RateLimiter(float(os.getenv("SEC_MAX_REQUESTS_PER_SECOND", "10")))
+
+
+# Throttled and transient gateway errors worth another attempt, and the methods safe to repeat
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_RETRY_METHODS = frozenset({"GET", "HEAD"})
+
+
+def _retry_after(response: requests.Response) -> float:
+    """Seconds requested by a Retry-After header (delta or HTTP date), else 0."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return 0.0
+    try:
+        return Retry(0).parse_retry_after(value)
+    except Exception:
+        return 0.0
+
+
+class _RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a SEC_RATE_LIMITER slot for every attempt, retries included.
+
+    urllib3's own Retry resends inside a single send() call, where the limiter cannot
+    see it, so GET/HEAD requests are retried here instead: on connection errors and
+    timeouts and on `_RETRY_STATUSES`, with exponential backoff that honors Retry-After.
+    The last response is returned once retries run out.
+    """
+
+    def __init__(self, retries: int = 3, backoff_factor: float = 1.0, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        attempt = 0
+        while True:
+            retryable = request.method in _RETRY_METHODS and attempt < self._retries
+            delay = self._backoff_factor * (2 ** attempt)
+            SEC_RATE_LIMITER.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not retryable:
+                    raise
+            else:
+                if not retryable or response.status_code not in _RETRY_STATUSES:
+                    return response
+                delay = max(delay, _retry_after(response))
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+
+# One connection pool per host, reused by every helper; callers pass their own User-Agent.
+SESSION = requests.Session()
+_ADAPTER = _RateLimitedAdapter(pool_connections=4, pool_maxsize=10)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+# (connect, read) seconds for blocking SEC requests
+DEFAULT_TIMEOUT = (5, 30)
+
+# ~256 KB of raw HTML/SGML comfortably covers the 20k characters sent to the LLM
+MAX_BODY_BYTES = 262144
+
+
+async def _throttle(request: httpx.Request) -> None:
+    await SEC_RATE_LIMITER.acquire_async()
+
+
+def sec_async_client(user_agent: str, max_connections: int = 10, **kwargs: Any) -> httpx.AsyncClient:
+    """Build an httpx.AsyncClient for SEC requests that shares the process rate limit.
+
+    A client is created per run rather than kept as a module singleton, because an
+    AsyncClient is bound to the event loop it was first used on.
+    """
+    hooks = kwargs.pop("event_hooks", {})
+    hooks = {**hooks, "request": [_throttle, *hooks.get("request", [])]}
+    return httpx.AsyncClient(
+        headers={"User-Agent": user_agent},
+        limits=httpx.Limits(max_connections=max_connections),
+        event_hooks=hooks,
+        **kwargs,
+    )
+
+
+def read_body(response: requests.Response, max_bytes: Optional[int] = MAX_BODY_BYTES) -> bytes:
+    """Read at most `max_bytes` (decompressed) bytes from a streamed response.
+
+    Args:
+        response: A response obtained with `stream=True`.
+        max_bytes: Byte cap; None reads the full body.
+    """
+    if max_bytes is None:
+        return response.content
+    return response.raw.read(max_bytes, decode_content=True) or b""
+
+
+def read_text(response: requests.Response, max_bytes: Optional[int] = MAX_BODY_BYTES) -> str:
+    """Like `read_body`, decoded with the response encoding (UTF-8 if unknown)."""
+    return read_body(response, max_bytes).decode(response.encoding or "utf-8", errors="ignore")
+
+
+def response_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return json.loads(response.content)
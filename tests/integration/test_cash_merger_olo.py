@@ -1,3 +1,4 @@
+import functools
 import os
 import unittest
 from datetime import date
@@ -23,9 +24,27 @@ ROOT = Path(__file__).resolve().parents[2]
 load_dotenv(ROOT / ".env")
 
 
+_TRUTHY = frozenset({"1", "true", "yes", "on"})
+
+
 def _truthy_env(name: str, default: str = "") -> bool:
-    val = os.getenv(name, default).strip().lower()
-    return val in {"1", "true", "yes", "on"}
+    return os.getenv(name, default).strip().lower() in _TRUTHY
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_user_agent() -> str:
+    """SEC User-Agent from EDGAR_IDENTITY/EDGAR_EMAIL, built once per test process."""
+    identity = os.getenv("EDGAR_IDENTITY")
+    email = os.getenv("EDGAR_EMAIL")
+    if not identity or not email:
+        # Not cached (lru_cache skips exceptions), so every test reports the skip
+        raise unittest.SkipTest("EDGAR_IDENTITY/EDGAR_EMAIL are required for SEC requests.")
+    return f"{identity} {email}"
+
+
+@functools.lru_cache(maxsize=1)
+def _has_openai_key() -> bool:
+    return bool(os.getenv("OPENAI_API_KEY"))
 
 
 @unittest.skipUnless(
@@ -34,14 +53,10 @@ def _truthy_env(name: str, default: str = "") -> bool:
 )
 class TestOloCashMergerIntegration(unittest.TestCase):
     def _user_agent(self) -> str:
-        identity = os.getenv("EDGAR_IDENTITY")
-        email = os.getenv("EDGAR_EMAIL")
-        if not identity or not email:
-            self.skipTest("EDGAR_IDENTITY/EDGAR_EMAIL are required for SEC requests.")
-        return f"{identity} {email}"
+        return _cached_user_agent()
 
     def _ensure_openai(self) -> None:
-        if not os.getenv("OPENAI_API_KEY"):
+        if not _has_openai_key():
             self.skipTest("OPENAI_API_KEY is required for LLM extraction.")
 
     def test_extract_cash_merger_terms(self) -> None:
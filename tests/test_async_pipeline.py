@@ -0,0 +1,109 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from src.core.async_pipeline import fetch_filing_text_async, fetch_html_texts, parse_html_to_text_async, prefetch_filings
+
+
+TXT_BODY = (
+    "<SEC-HEADER>\n"
+    "COMPANY CONFORMED NAME:\tTest Co\n"
+    "</SEC-HEADER>\n"
+    "<DOCUMENT>\n<TYPE>8-K\n<FILENAME>tc-8k.htm\n"
+)
+HTML_BODY = b"<html><body><p>Merger Agreement</p><script>x = 1</script></body></html>"
+
+
+class AsyncPipelineTests(unittest.TestCase):
+    def _client(self, requested):
+        def handler(request: httpx.Request) -> httpx.Response:
+            requested.append(str(request.url))
+            path = request.url.path
+            if path.endswith("0000000001-25-000001.txt"):
+                return httpx.Response(200, text=TXT_BODY)
+            if path.endswith("/000000000125000001/tc-8k.htm"):
+                return httpx.Response(200, content=HTML_BODY)
+            return httpx.Response(404)
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler), headers={"User-Agent": "ua"})
+
+    @patch.dict(os.environ, {"LLM_ENABLED": "false"})
+    def test_prefetch_resolves_html_from_txt_and_keeps_order(self) -> None:
+        requested = []
+        file_names = ["edgar/data/1/0000000001-25-000001.txt", "edgar/data/2/missing.txt"]
+
+        async def run():
+            async with self._client(requested) as client:
+                return await prefetch_filings(file_names, "ua", client=client)
+
+        items = asyncio.run(run())
+
+        self.assertEqual([i.file_name for i in items], file_names)
+        ok, missing = items
+        self.assertIn("<FILENAME>tc-8k.htm", ok.content)
+        self.assertEqual(
+            ok.html_link,
+            "https://www.sec.gov/Archives/edgar/data/1/000000000125000001/tc-8k.htm",
+        )
+        self.assertEqual(ok.parsed_text, "Merger Agreement")
+        self.assertIsNone(ok.llm_res)
+        self.assertEqual(missing.content, "")
+        self.assertIsNone(missing.parsed_text)
+        # The .txt submission is downloaded once; the HTML link is resolved from it
+        self.assertEqual(sum(u.endswith("0000000001-25-000001.txt") for u in requested), 1)
+
+    def test_parse_html_uses_response_charset(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                content=b"<p>\x93Merger\x94 \x97 $10.25</p>",
+                headers={"Content-Type": "text/html; charset=windows-1252"},
+            )
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await parse_html_to_text_async(client, asyncio.Semaphore(1), "https://www.sec.gov/a.htm")
+
+        self.assertEqual(asyncio.run(run()), "\u201cMerger\u201d \u2014 $10.25")
+
+    def test_prefetch_requires_user_agent(self) -> None:
+        with self.assertRaises(ValueError):
+            asyncio.run(prefetch_filings(["edgar/data/1/x.txt"], ""))
+
+    def test_fetch_html_texts_keeps_input_order(self) -> None:
+        urls = ["https://example.com/a.htm", "https://example.com/missing.htm", "https://example.com/b.htm"]
+
+        def fake_parse(url, user_agent):
+            return None if "missing" in url else f"text of {url.rsplit('/', 1)[-1]}"
+
+        with patch("src.core.async_pipeline.parse_html_to_text_cached", side_effect=fake_parse):
+            texts = asyncio.run(fetch_html_texts(urls, "ua"))
+
+        self.assertEqual(texts, ["text of a.htm", None, "text of b.htm"])
+
+    @patch("src.core.async_pipeline.asyncio.sleep")
+    def test_throttled_fetch_is_retried(self, sleep) -> None:
+        calls = []
+
+        async def no_sleep(_):
+            return None
+
+        sleep.side_effect = no_sleep
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            return httpx.Response(429) if len(calls) == 1 else httpx.Response(200, text=TXT_BODY)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await fetch_filing_text_async(client, asyncio.Semaphore(1), "edgar/data/1/x.txt")
+
+        self.assertIn("Test Co", asyncio.run(run()))
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
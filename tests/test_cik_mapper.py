@@ -1,92 +1,171 @@
+import io
+import json
+import sys
+import tempfile
 import unittest
+from contextlib import ExitStack
 from unittest.mock import patch, Mock
 
-from src.utils.cik_mapper import CIKMapper
+from src.utils import cik_mapper
+from src.utils.cik_mapper import CIKMapper, get_cik_mapper
 
 
-class CIKMapperHeuristicsTests(unittest.TestCase):
+def _mock_get(url_returns):
+    """Helper to create a SESSION.get mock with per-URL JSON bodies."""
+    def _side_effect(url, headers=None, **kwargs):
+        body = url_returns.get(url)
+        if body is None:
+            raise AssertionError(f"Unexpected URL requested: {url}")
+        m = Mock()
+        m.raise_for_status = Mock()
+        m.content = json.dumps(body).encode()
+        m.raw = io.BytesIO(m.content)
+        return m
+    return _side_effect
+
+
+class _SharedMapperTestCase(unittest.TestCase):
+    """Builds one CIKMapper per class from TICKERS_JSON / EXCHANGE_JSON.
+
+    The mocked download and map build happen once in setUpClass; tests only read
+    from the mapper, so they can share it.
+    """
+
+    TICKERS_JSON: dict = {}
+    EXCHANGE_JSON: dict = {}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        stack = ExitStack()
+        cls.addClassCleanup(stack.close)
+        cls.mock_get = stack.enter_context(patch("src.utils.cik_mapper.SESSION.get"))
+        cls.mock_get.side_effect = _mock_get({
+            CIKMapper._CIK_TICKER_URL: cls.TICKERS_JSON,
+            CIKMapper._CIK_EXCHANGE_URL: cls.EXCHANGE_JSON,
+        })
+        cls.mapper = CIKMapper(user_agent="test-UA")
+
+
+class PrimaryTickerHeuristicsTests(_SharedMapperTestCase):
+    TICKERS_JSON = {
+        "0": {"cik_str": 1234567, "ticker": "ABC", "title": "ABC Inc. Common Stock"},
+        "1": {"cik_str": 1234567, "ticker": "ABC-PB", "title": "ABC Inc. Preferred Series B"},
+        "2": {"cik_str": 1234567, "ticker": "ABC-WS", "title": "ABC Inc. Warrants"},
+    }
+    EXCHANGE_JSON = {
+        "fields": ["cik", "entityName", "ticker", "exchange"],
+        "data": [
+            [1234567, "ABC Inc.", "ABC", "NASDAQ"],
+            [1234567, "ABC Inc.", "ABC-PB", "NYSE"],
+            [1234567, "ABC Inc.", "ABC-WS", "NYSE"],
+        ],
+    }
+
+    def test_primary_ticker_prefers_common_over_pref_warrant_and_primary_exchange(self):
+        self.assertEqual(self.mapper.get_primary_ticker_by_cik("0001234567"), "ABC")
+        self.assertSetEqual(set(self.mapper.get_all_tickers_by_cik("0001234567")), {"ABC", "ABC-PB", "ABC-WS"})
+
+    def test_exchange_per_ticker(self):
+        self.assertEqual(self.mapper.get_exchange("0001234567", "ABC"), "NASDAQ")
+        self.assertEqual(self.mapper.get_exchange("0001234567", "ABC-PB"), "NYSE")
+
+    def test_files_downloaded_once_for_the_class(self):
+        self.mapper.get_exchange_by_cik("1234567")
+        self.assertEqual(self.mock_get.call_count, 2)
+
+
+class DualClassHeuristicsTests(_SharedMapperTestCase):
+    TICKERS_JSON = {
+        "0": {"cik_str": 7654321, "ticker": "XYZ", "title": "XYZ Corp. Class A Common"},
+        "1": {"cik_str": 7654321, "ticker": "XYZ-B", "title": "XYZ Corp. Class B Common"},
+    }
+    EXCHANGE_JSON = {
+        "fields": ["cik", "entityName", "ticker", "exchange"],
+        "data": [
+            [7654321, "XYZ Corp.", "XYZ", "NASDAQ"],
+            [7654321, "XYZ Corp.", "XYZ-B", "NASDAQ"],
+        ],
+    }
+
+    def test_dual_class_mild_suffix_deprioritized(self):
+        self.assertEqual(self.mapper.get_primary_ticker_by_cik("7654321"), "XYZ")
+        self.assertSetEqual(set(self.mapper.get_all_tickers_by_cik("7654321")), {"XYZ", "XYZ-B"})
+
+
+class CIKMapperLoadingTests(unittest.TestCase):
     def setUp(self) -> None:
-        # Reset class-level caches to avoid cross-test contamination
-        CIKMapper._securities_by_cik = None
-        CIKMapper._exchange_by_cik_ticker = None
-
-    def _mock_get(self, url_returns):
-        """Helper to create a requests.get mock with per-URL JSON bodies."""
-        def _side_effect(url, headers=None):
-            body = url_returns.get(url)
-            if body is None:
-                raise AssertionError(f"Unexpected URL requested: {url}")
-            m = Mock()
-            m.raise_for_status = Mock()
-            m.json = Mock(return_value=body)
-            return m
-        return _side_effect
-
-    @patch("src.utils.cik_mapper.requests.get")
-    def test_primary_ticker_prefers_common_over_pref_warrant_and_primary_exchange(self, mock_get):
-        # Arrange mock SEC payloads
-        tickers_json = {
-            "0": {"cik_str": 1234567, "ticker": "ABC", "title": "ABC Inc. Common Stock"},
-            "1": {"cik_str": 1234567, "ticker": "ABC-PB", "title": "ABC Inc. Preferred Series B"},
-            "2": {"cik_str": 1234567, "ticker": "ABC-WS", "title": "ABC Inc. Warrants"},
-        }
-        exchange_json = {
-            "fields": ["cik", "entityName", "ticker", "exchange"],
-            "data": [
-                [1234567, "ABC Inc.", "ABC", "NASDAQ"],
-                [1234567, "ABC Inc.", "ABC-PB", "NYSE"],
-                [1234567, "ABC Inc.", "ABC-WS", "NYSE"],
-            ],
-        }
-        url_map = {
+        # Reset the process-wide instance to avoid cross-test contamination
+        cik_mapper._INSTANCE = None
+
+    @patch("src.utils.cik_mapper.SESSION.get")
+    def test_exchange_map_without_ijson(self, mock_get):
+        tickers_json = {"0": {"cik_str": 42, "ticker": "FOO", "title": "Foo Inc."}}
+        exchange_json = {"fields": ["cik", "name", "ticker", "exchange"], "data": [[42, "Foo Inc.", "FOO", "NYSE"]]}
+        mock_get.side_effect = _mock_get({
             CIKMapper._CIK_TICKER_URL: tickers_json,
             CIKMapper._CIK_EXCHANGE_URL: exchange_json,
-        }
-        mock_get.side_effect = self._mock_get(url_map)
+        })
 
-        mapper = CIKMapper(user_agent="test-UA")
+        with patch("src.utils.cik_mapper.ijson", None):
+            mapper = CIKMapper(user_agent="test-UA")
+            self.assertEqual(mapper.get_exchange_by_cik("42"), "NYSE")
 
-        # Act
-        primary = mapper.get_primary_ticker_by_cik("0001234567")
-        all_tickers = set(mapper.get_all_tickers_by_cik("0001234567"))
-        exch_primary = mapper.get_exchange("0001234567", "ABC")
-        exch_pref = mapper.get_exchange("0001234567", "ABC-PB")
-
-        # Assert
-        self.assertEqual(primary, "ABC")
-        self.assertSetEqual(all_tickers, {"ABC", "ABC-PB", "ABC-WS"})
-        self.assertEqual(exch_primary, "NASDAQ")
-        self.assertEqual(exch_pref, "NYSE")
-
-    @patch("src.utils.cik_mapper.requests.get")
-    def test_dual_class_mild_suffix_deprioritized(self, mock_get):
-        # Arrange mock SEC payloads
-        tickers_json = {
-            "0": {"cik_str": 7654321, "ticker": "XYZ", "title": "XYZ Corp. Class A Common"},
-            "1": {"cik_str": 7654321, "ticker": "XYZ-B", "title": "XYZ Corp. Class B Common"},
-        }
-        exchange_json = {
-            "fields": ["cik", "entityName", "ticker", "exchange"],
-            "data": [
-                [7654321, "XYZ Corp.", "XYZ", "NASDAQ"],
-                [7654321, "XYZ Corp.", "XYZ-B", "NASDAQ"],
-            ],
-        }
-        url_map = {
+    @patch("src.utils.cik_mapper.SESSION.head")
+    @patch("src.utils.cik_mapper.SESSION.get")
+    def test_warm_start_loads_maps_from_disk_cache(self, mock_get, mock_head):
+        tickers_json = {"0": {"cik_str": 42, "ticker": "FOO", "title": "Foo Inc."}}
+        exchange_json = {"fields": ["cik", "name", "ticker", "exchange"], "data": [[42, "Foo Inc.", "FOO", "NYSE"]]}
+        get = _mock_get({
             CIKMapper._CIK_TICKER_URL: tickers_json,
             CIKMapper._CIK_EXCHANGE_URL: exchange_json,
-        }
-        mock_get.side_effect = self._mock_get(url_map)
+        })
+
+        def _get_with_etag(url, headers=None, **kwargs):
+            m = get(url, headers, **kwargs)
+            m.headers = {"ETag": f'"{url}-v1"'}
+            return m
+
+        mock_get.side_effect = _get_with_etag
+        mock_head.side_effect = lambda url, **kwargs: Mock(headers={"ETag": f'"{url}-v1"'})
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.assertEqual(CIKMapper("test-UA", cache_dir=cache_dir).get_exchange_by_cik("42"), "NYSE")
+            self.assertEqual(mock_get.call_count, 2)
+
+            # Fresh process (new instance), files unchanged -> no downloads
+            self.assertEqual(CIKMapper("test-UA", cache_dir=cache_dir).get_exchange_by_cik("42"), "NYSE")
+            self.assertEqual(mock_get.call_count, 2)
+
+            # A changed ETag invalidates the cache
+            mock_head.side_effect = lambda url, **kwargs: Mock(headers={"ETag": '"v2"'})
+            CIKMapper("test-UA", cache_dir=cache_dir).get_exchange_by_cik("42")
+            self.assertEqual(mock_get.call_count, 4)
+
+    def test_get_cik_mapper_returns_one_instance(self):
+        first = get_cik_mapper("test-UA")
+        self.assertIs(get_cik_mapper("other-UA"), first)
+        # Caches are per instance, so a separately built mapper starts empty
+        self.assertIsNone(CIKMapper("test-UA")._securities_by_cik)
+
+    @patch("src.utils.cik_mapper.SESSION.get")
+    def test_padded_and_unpadded_ciks_share_entries(self, mock_get):
+        mock_get.side_effect = _mock_get({
+            CIKMapper._CIK_TICKER_URL: {"0": {"cik_str": 42, "ticker": "FOO", "title": "Foo Inc."}},
+            CIKMapper._CIK_EXCHANGE_URL: {"fields": ["cik", "ticker", "exchange"], "data": [[42, "FOO", "NYSE"]]},
+        })
 
         mapper = CIKMapper(user_agent="test-UA")
 
-        # Act
-        primary = mapper.get_primary_ticker_by_cik("7654321")
-        all_tickers = set(mapper.get_all_tickers_by_cik("7654321"))
+        for cik in ("42", "0000000042", "042", " 42"):
+            self.assertEqual(mapper.get_ticker_by_cik(cik), "FOO")
+            self.assertEqual(mapper.get_exchange(cik, "foo"), "NYSE")
+        self.assertIs(mapper._securities_by_cik["0000000042"], mapper._securities_by_cik["42"])
+
+        # Exchange names are interned, so equal values are the same object
+        self.assertIs(mapper.get_exchange("42", "FOO"), sys.intern("".join(["NY", "SE"])))
 
-        # Assert
-        self.assertEqual(primary, "XYZ")
-        self.assertSetEqual(all_tickers, {"XYZ", "XYZ-B"})
+        frame = mapper.to_dataframe()
+        self.assertEqual(frame.to_dict("records"), [{"cik": "42", "ticker": "FOO", "exchange": "NYSE"}])
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,11 +1,19 @@
 import unittest
-from typing import Set, Optional
+from typing import FrozenSet, Optional
 
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
 
 from src.core.db import get_engine
 
+REQUIRED_TABLES: FrozenSet[str] = frozenset({
+    "corporate_actions",
+    "corporate_action_sources",
+    "corporate_action_consideration_legs",
+    "corporate_action_provenance",
+})
+REQUIRED_COLUMNS: FrozenSet[str] = frozenset({"event_id", "action_type", "issuer_name", "details_json", "updated_at"})
+
 
 class DBConnectivityConsistencyTests(unittest.TestCase):
     """Tests database connectivity and basic schema consistency.
@@ -14,68 +22,70 @@ class DBConnectivityConsistencyTests(unittest.TestCase):
     """
 
     engine: Optional[Engine] = None
+    # One connection shared by the (read-only) tests of this class
+    conn: Optional[Connection] = None
 
     @classmethod
     def setUpClass(cls) -> None:
         try:
             cls.engine = get_engine()
+            cls.conn = cls.engine.connect()
             # Validate a simple connection and statement execution
-            with cls.engine.connect() as conn:
-                conn.execute(text("select 1"))
+            cls.conn.execute(text("select 1"))
+            cls.conn.rollback()
         except Exception as e:  # pragma: no cover - environment dependent
+            cls.tearDownClass()
             raise unittest.SkipTest(f"Skipping DB tests: {e}")
 
     @classmethod
     def tearDownClass(cls) -> None:
-        # Ensure pooled connections are released
-        if cls.engine is not None:
-            try:
-                cls.engine.dispose()
-            finally:
-                cls.engine = None
+        # Ensure the shared and pooled connections are released
+        try:
+            if cls.conn is not None:
+                cls.conn.close()
+        finally:
+            cls.conn = None
+            if cls.engine is not None:
+                try:
+                    cls.engine.dispose()
+                finally:
+                    cls.engine = None
+
+    def tearDown(self) -> None:
+        # End the transaction each test autobegins, so tests stay isolated
+        if self.conn is not None:
+            self.conn.rollback()
 
     def test_select_1_connectivity(self) -> None:
         """Ensure the database is reachable and a simple query works."""
-        assert self.engine is not None
-        with self.engine.connect() as conn:
-            ok = conn.execute(text("select 1 as ok")).scalar()
+        assert self.conn is not None
+        ok = self.conn.execute(text("select 1 as ok")).scalar()
         self.assertEqual(ok, 1)
 
     def test_schema_consistency(self) -> None:
         """Check required tables and key columns exist in the public schema."""
-        assert self.engine is not None
-        required_tables: Set[str] = {
-            "corporate_actions",
-            "corporate_action_sources",
-            "corporate_action_consideration_legs",
-            "corporate_action_provenance",
-        }
-        with self.engine.connect() as conn:
-            rs = conn.execute(text(
-                """
-                select table_name
-                from information_schema.tables
-                where table_schema = 'public'
-                """
-            ))
-            tables = {row[0] for row in rs.fetchall()}
-        missing = required_tables - tables
+        assert self.conn is not None
+        # Tables ('t') and corporate_actions columns ('c') in one round-trip
+        rows = self.conn.execute(text(
+            """
+            select 't' as kind, table_name as name
+            from information_schema.tables
+            where table_schema = 'public'
+            union all
+            select 'c', column_name
+            from information_schema.columns
+            where table_schema = 'public' and table_name = 'corporate_actions'
+            """
+        )).fetchall()
+        tables = {name for kind, name in rows if kind == "t"}
+        cols = {name for kind, name in rows if kind == "c"}
+
+        missing = REQUIRED_TABLES.difference(tables)
         self.assertFalse(
             missing,
             f"Missing expected tables in public schema: {sorted(missing)}"
         )
-
-        required_columns: Set[str] = {"event_id", "action_type", "issuer_name", "details_json", "updated_at"}
-        with self.engine.connect() as conn:
-            rs = conn.execute(text(
-                """
-                select column_name
-                from information_schema.columns
-                where table_schema = 'public' and table_name = 'corporate_actions'
-                """
-            ))
-            cols = {row[0] for row in rs.fetchall()}
-        missing_cols = required_columns - cols
+        missing_cols = REQUIRED_COLUMNS.difference(cols)
         self.assertFalse(
             missing_cols,
             f"Missing columns in public.corporate_actions: {sorted(missing_cols)}"
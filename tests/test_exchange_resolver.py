@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils import _exchange_data
+from src.utils.exchange_resolver import (
+    DEFAULT_CSV_PATH,
+    ExchangeResolver,
+    get_exchange_resolver,
+    read_exchange_csv,
+    render_exchange_data,
+)
+
+
+class ExchangeResolverTests(unittest.TestCase):
+    def test_loads_aliases_and_first_display_name(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "exchanges.csv"
+            csv_path.write_text(
+                "alias,mic,display_name\n"
+                " nasdaq ,xnas,NASDAQ\n"
+                "Nasdaq Global Select,XNAS,Nasdaq GS\n"
+                "OTC,,\n",
+                encoding="utf-8",
+            )
+            resolver = ExchangeResolver(csv_path)
+
+            self.assertEqual(resolver.to_mic("Nasdaq"), "XNAS")
+            self.assertEqual(resolver.to_mic("NASDAQ GLOBAL SELECT"), "XNAS")
+            self.assertIsNone(resolver.to_mic("OTC"))
+            self.assertEqual(resolver.mic_to_name("xnas"), "NASDAQ")
+            self.assertEqual(resolver.mic_to_name("XXXX"), "XXXX")
+            self.assertEqual(resolver.alias_to_mic["NASDAQ"], "XNAS")
+            self.assertEqual(
+                resolver.to_mic_series(pd.Series([" nasdaq", None, "OTC"])).tolist()[0], "XNAS"
+            )
+            self.assertTrue(resolver.to_mic_series(pd.Series([None, "OTC"])).isna().all())
+            with self.assertRaises(TypeError):
+                resolver.alias_to_mic["NYSE"] = "XNYS"  # type: ignore[index]
+
+    def test_missing_file_gives_empty_maps(self) -> None:
+        resolver = ExchangeResolver(Path("/nonexistent/exchanges.csv"))
+        self.assertIsNone(resolver.to_mic("NYSE"))
+
+    def test_bundled_csv_resolves_nyse(self) -> None:
+        self.assertEqual(get_exchange_resolver().to_mic("NYSE"), "XNYS")
+
+    def test_generated_module_matches_csv(self) -> None:
+        # Fails when exchanges.csv is edited without `python -m src.utils.exchange_resolver`
+        generated = Path(_exchange_data.__file__).read_text(encoding="utf-8")
+        self.assertEqual(generated, render_exchange_data(DEFAULT_CSV_PATH))
+        self.assertEqual(
+            (_exchange_data.ALIAS_TO_MIC, _exchange_data.MIC_TO_NAME),
+            read_exchange_csv(DEFAULT_CSV_PATH),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.utils.filing_link_converter import _resolve_cached, convert_many, convert_txt_link_to_html, find_html_link
+
+
+TXT_URL = "https://www.sec.gov/Archives/edgar/data/1234/0001234567-25-000001.txt"
+BASE = "https://www.sec.gov/Archives/edgar/data/1234/000123456725000001"
+
+
+class FindHtmlLinkTests(unittest.TestCase):
+    def test_filename_tag_wins_over_later_patterns(self) -> None:
+        content = (
+            '<XBRL instance="abc-20250101_htm.xml" original="other.htm">\n'
+            "<DOCUMENT>\n<TYPE>8-K\n<filename>abc-8k.htm\n"
+        )
+        self.assertEqual(find_html_link(TXT_URL, content), f"{BASE}/abc-8k.htm")
+
+    def test_first_filename_not_html_falls_back_to_regex(self) -> None:
+        content = "<FILENAME>cover.pdf\n<FILENAME>abc-8k.htm \r\n"
+        self.assertEqual(find_html_link(TXT_URL, content), f"{BASE}/abc-8k.htm")
+
+    def test_filename_tag_beyond_search_window_still_wins(self) -> None:
+        content = '<x instance="inst.htm">\n' + "filler\n" * 20000 + "<filename>late.htm\n"
+        self.assertEqual(find_html_link(TXT_URL, content), f"{BASE}/late.htm")
+
+    def test_instance_attribute(self) -> None:
+        content = '<ix:header instance="abc-20250101.html">'
+        self.assertEqual(find_html_link(TXT_URL, content), f"{BASE}/abc-20250101.html")
+
+    def test_priority_holds_regardless_of_position(self) -> None:
+        content = '{"baseRef": "late.htm"} original="orig.htm" instance="inst.htm"'
+        self.assertEqual(find_html_link(TXT_URL, content), f"{BASE}/inst.htm")
+
+    def test_base_ref_json(self) -> None:
+        content = '{"baseRef": "abc-8k_2.htm"}'
+        self.assertEqual(find_html_link(TXT_URL, content), f"{BASE}/abc-8k_2.htm")
+
+    def test_generic_fallback_and_miss(self) -> None:
+        self.assertEqual(find_html_link(TXT_URL, "see ex99-1.htm for details"), f"{BASE}/ex99-1.htm")
+        self.assertIsNone(find_html_link(TXT_URL, "<TYPE>8-K\n<FILENAME>abc.pdf\n"))
+
+
+def _streamed_response(chunks, status_code=200):
+    m = MagicMock()
+    m.status_code = status_code
+    m.__enter__.return_value = m
+    m.encoding = "ISO-8859-1"
+    m.iter_content.return_value = iter(chunks)
+    return m
+
+
+class ConvertTxtLinkToHtmlTests(unittest.TestCase):
+    def setUp(self) -> None:
+        _resolve_cached.cache_clear()
+
+    @patch("src.utils.filing_link_converter.SESSION.get")
+    def test_stops_reading_after_filename_line(self, mock_get) -> None:
+        # The tag is split across chunks; the exhibit chunks must not be consumed
+        chunks = iter([b"<SEC-HEADER>\n<DOCUMENT>\n<FILENAME>abc-8", b"k.htm\n<TEXT>", b"ex99.htm\n", b"tail\n"])
+        mock_get.return_value = _streamed_response(chunks)
+
+        self.assertEqual(convert_txt_link_to_html(TXT_URL, "UA"), f"{BASE}/abc-8k.htm")
+        self.assertEqual(next(chunks), b"ex99.htm\n")
+        mock_get.return_value.raw.drain_conn.assert_not_called()
+        mock_get.return_value.__exit__.assert_called_once()
+
+    @patch("src.utils.filing_link_converter.SESSION.get")
+    def test_reads_whole_body_without_filename_tag(self, mock_get) -> None:
+        mock_get.return_value = _streamed_response([b'<xbrl original="a.htm">\n', b'instance="b.htm"'])
+        self.assertEqual(convert_txt_link_to_html(TXT_URL, "UA"), f"{BASE}/b.htm")
+
+    @patch("src.utils.filing_link_converter.SESSION.get")
+    def test_requests_header_range_first(self, mock_get) -> None:
+        mock_get.return_value = _streamed_response([b"<DOCUMENT>\n<FILENAME>abc-8k.htm\n"], status_code=206)
+
+        self.assertEqual(convert_txt_link_to_html(TXT_URL, "UA"), f"{BASE}/abc-8k.htm")
+        mock_get.assert_called_once()
+        headers = mock_get.call_args.kwargs["headers"]
+        self.assertEqual(headers["Range"], "bytes=0-32767")
+        self.assertEqual(headers["Accept-Encoding"], "identity")
+        mock_get.return_value.raw.release_conn.assert_called_once()
+
+    @patch("src.utils.filing_link_converter.SESSION.get")
+    def test_falls_back_to_full_get_when_range_misses(self, mock_get) -> None:
+        # The range cuts the tag mid-name; the truncated 'abc.ht' line must not be used
+        mock_get.side_effect = [
+            _streamed_response([b"<DOCUMENT>\n<FILENAME>abc.ht"], status_code=206),
+            _streamed_response([b"<DOCUMENT>\n<FILENAME>abc.html\n"]),
+        ]
+
+        self.assertEqual(convert_txt_link_to_html(TXT_URL, "UA"), f"{BASE}/abc.html")
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertNotIn("Range", mock_get.call_args.kwargs["headers"])
+
+    @patch("src.utils.filing_link_converter.SESSION.get")
+    def test_results_are_memoized_but_errors_are_not(self, mock_get) -> None:
+        mock_get.side_effect = [
+            requests.exceptions.ConnectionError("reset"),
+            _streamed_response([b"<FILENAME>abc-8k.htm\n"], status_code=206),
+        ]
+
+        self.assertIsNone(convert_txt_link_to_html(TXT_URL, "UA"))
+        self.assertEqual(convert_txt_link_to_html(TXT_URL, "UA"), f"{BASE}/abc-8k.htm")
+        self.assertEqual(convert_txt_link_to_html(TXT_URL, "UA"), f"{BASE}/abc-8k.htm")
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class ConvertManyTests(unittest.TestCase):
+    @patch("src.utils.filing_link_converter.convert_txt_link_to_html")
+    def test_results_keep_input_order(self, mock_convert) -> None:
+        mock_convert.side_effect = lambda url, ua: None if url.endswith("2.txt") else url.replace(".txt", ".htm")
+        urls = [f"https://www.sec.gov/Archives/{i}.txt" for i in range(1, 6)]
+
+        results = convert_many(urls, "UA", max_workers=3)
+
+        self.assertEqual(results[1], None)
+        self.assertEqual(results[4], "https://www.sec.gov/Archives/5.htm")
+        self.assertEqual(len(results), 5)
+        self.assertEqual(convert_many([], "UA"), [])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,46 @@
+import re
+import unittest
+
+from src.processors import filing_parser
+from src.processors.filing_parser import classify_action_type, parse_filing_header
+
+
+HEADER = (
+    "<SEC-HEADER>0001234567-25-000001.hdr.sgml : 20250701\n"
+    "ACCESSION NUMBER:\t\t0001234567-25-000001\n"
+    "CONFORMED SUBMISSION TYPE:\t8-K\n"
+    "\tCOMPANY CONFORMED NAME:\t\t\tABC Inc.\n"
+    "</SEC-HEADER>\n<DOCUMENT>\n"
+)
+
+
+class ParseFilingHeaderTests(unittest.TestCase):
+    def test_key_value_pairs(self) -> None:
+        data = parse_filing_header(HEADER)
+        self.assertEqual(data["ACCESSION NUMBER"], "0001234567-25-000001")
+        self.assertEqual(data["CONFORMED SUBMISSION TYPE"], "8-K")
+        self.assertEqual(data["COMPANY CONFORMED NAME"], "ABC Inc.")
+
+    def test_missing_header(self) -> None:
+        self.assertEqual(parse_filing_header("<DOCUMENT>\n<TYPE>8-K\n"), {})
+
+
+class ClassifyActionTypeTests(unittest.TestCase):
+    def test_keywords_before_item_codes(self) -> None:
+        self.assertEqual(classify_action_type("Item 1.01 ... merger agreement"), "Merger/Acquisition")
+
+    def test_item_code_fallback_in_order(self) -> None:
+        self.assertEqual(classify_action_type("ITEM  5.02 and Item 2.01"), "Director/Officer Change")
+        self.assertEqual(classify_action_type("Item 2.01 Completion"), "Completion of Acquisition/Disposition")
+        self.assertEqual(classify_action_type("Item 8.01 Other Events"), "Unclassified")
+
+    def test_patterns_are_precompiled(self) -> None:
+        # Guards against reintroducing per-call re.search/re.compile on raw strings
+        self.assertIsInstance(filing_parser._SEC_HEADER_PATTERN, re.Pattern)
+        self.assertIsInstance(filing_parser._HEADER_LINE_PATTERN, re.Pattern)
+        for pattern, _ in filing_parser._ITEM_PATTERNS:
+            self.assertIsInstance(pattern, re.Pattern)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
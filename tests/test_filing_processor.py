@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 import requests
 
 from src.processors.filing_processor import fetch_filing_text
+from src.utils.sec_client import MAX_BODY_BYTES
 
 
 class FilingProcessorTests(unittest.TestCase):
@@ -16,9 +17,10 @@ class FilingProcessorTests(unittest.TestCase):
 
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
-        mock_response.text = "OK"
+        mock_response.encoding = "utf-8"
+        mock_response.raw.read.return_value = b"OK"
 
-        with patch("src.processors.filing_processor.requests.get", return_value=mock_response) as mock_get:
+        with patch("src.processors.filing_processor.SESSION.get", return_value=mock_response) as mock_get:
             text = fetch_filing_text(file_name, user_agent=ua)
 
         self.assertEqual(text, "OK")
@@ -28,13 +30,28 @@ class FilingProcessorTests(unittest.TestCase):
         self.assertTrue(called_url.endswith(file_name))
         self.assertIn("User-Agent", called_headers)
         self.assertEqual(called_headers["User-Agent"], ua)
+        self.assertTrue(mock_get.call_args[1]["stream"])
+        self.assertEqual(mock_response.raw.read.call_args[0][0], MAX_BODY_BYTES)
+        mock_response.close.assert_called_once()
+
+    def test_fetch_filing_text_without_cap_reads_full_body(self) -> None:
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.encoding = "utf-8"
+        mock_response.content = b"FULL"
+
+        with patch("src.processors.filing_processor.SESSION.get", return_value=mock_response):
+            text = fetch_filing_text("edgar/data/0000000000/filing.txt", user_agent="ua", max_bytes=None)
+
+        self.assertEqual(text, "FULL")
+        mock_response.raw.read.assert_not_called()
 
     def test_fetch_filing_text_failure_returns_empty_string(self) -> None:
         file_name = "edgar/data/0000000000/missing.txt"
         ua = "MyApp/1.0 my@email"
 
         with patch(
-            "src.processors.filing_processor.requests.get",
+            "src.processors.filing_processor.SESSION.get",
             side_effect=requests.exceptions.RequestException("boom"),
         ):
             text = fetch_filing_text(file_name, user_agent=ua)
@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import requests
+
+from src.processors.html_parser import _parse_cached, html_to_text, parse_html_to_text, parse_html_to_text_cached
+
+
+class HTMLParserTests(unittest.TestCase):
+    def _mock_response(self, body: bytes) -> MagicMock:
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.raw.read.return_value = body
+        mock_response.headers = {"Content-Type": "text/html"}
+        return mock_response
+
+    def test_parse_html_strips_scripts_and_blank_lines(self) -> None:
+        body = (
+            b"<html><head><style>p {color: red}</style></head><body>"
+            b"<script>var x = 1;</script>"
+            b"<p>  Merger Agreement  </p><p></p><div>Item 1.01</div>"
+            b"</body></html>"
+        )
+        with patch("src.processors.html_parser.SESSION.get", return_value=self._mock_response(body)):
+            text = parse_html_to_text("https://example.com/a.htm", user_agent="ua")
+
+        self.assertEqual(text, "Merger Agreement\nItem 1.01")
+
+    def test_inline_tags_do_not_break_lines(self) -> None:
+        body = (
+            b"<html><body><p>The <b>merger</b> consideration is <span>$</span><span>10.25</span> per share.</p>"
+            b"<div>Record<br>Date</div><table><tr><td>Ex-Date</td><td>July 1, 2025</td></tr></table>"
+            b"</body></html>"
+        )
+        self.assertEqual(
+            html_to_text(body),
+            "The merger consideration is $10.25 per share.\nRecord\nDate\nEx-Date July 1, 2025",
+        )
+
+    def test_meta_charset_is_honored(self) -> None:
+        body = (
+            b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1252"></head>'
+            b"<body><p>\x93Merger\x94 \x97 $10.25</p></body></html>"
+        )
+        self.assertEqual(html_to_text(body), "\u201cMerger\u201d \u2014 $10.25")
+
+    def test_declared_charset_and_utf8_default(self) -> None:
+        self.assertEqual(html_to_text(b"<p>\x93Merger\x94</p>", "ISO-8859-1"), "\u201cMerger\u201d")
+        self.assertEqual(html_to_text("<p>\u201cMerger\u201d</p>".encode("utf-8")), "\u201cMerger\u201d")
+        # Undeclared and not UTF-8: read as windows-1252
+        self.assertEqual(html_to_text(b"<p>\x93Merger\x94</p>"), "\u201cMerger\u201d")
+
+    def test_parse_html_beautifulsoup_fallback(self) -> None:
+        body = b"<html><body><script>x = 1</script><p>Stock Split</p><p>Record Date</p></body></html>"
+        with patch("src.processors.html_parser.LexborHTMLParser", None), patch(
+            "src.processors.html_parser.SESSION.get", return_value=self._mock_response(body)
+        ):
+            text = parse_html_to_text("https://example.com/a.htm", user_agent="ua")
+
+        self.assertEqual(text, "Stock Split\nRecord Date")
+
+    def test_beautifulsoup_fallback_inline_tags_and_meta_charset(self) -> None:
+        body = (
+            b'<html><head><meta charset="windows-1252"></head><body>'
+            b"<p>The <b>\x93merger\x94</b> pays <span>$</span><span>10.25</span>.</p>"
+            b"<table><tr><td>Ex-Date</td><td>July 1</td></tr></table></body></html>"
+        )
+        with patch("src.processors.html_parser.LexborHTMLParser", None):
+            self.assertEqual(html_to_text(body), "The \u201cmerger\u201d pays $10.25.\nEx-Date July 1")
+
+    def test_parse_html_empty_url_returns_none(self) -> None:
+        self.assertIsNone(parse_html_to_text("", user_agent="ua"))
+
+    def test_parse_html_fetch_error_returns_none(self) -> None:
+        with patch(
+            "src.processors.html_parser.SESSION.get",
+            side_effect=requests.exceptions.RequestException("boom"),
+        ):
+            self.assertIsNone(parse_html_to_text("https://example.com/a.htm", user_agent="ua"))
+
+    def test_cached_parse_fetches_each_url_once_including_missing(self) -> None:
+        _parse_cached.cache_clear()
+        self.addCleanup(_parse_cached.cache_clear)
+        body = b"<html><body><p>Tender Offer</p></body></html>"
+        missing = MagicMock()
+        missing.status_code = 404
+        missing.raise_for_status.side_effect = requests.HTTPError("404", response=missing)
+
+        def _get(url, **kwargs):
+            if url.endswith("missing.htm"):
+                return missing
+            return self._mock_response(body)
+
+        with patch("src.processors.html_parser.SESSION.get", side_effect=_get) as mock_get:
+            for _ in range(3):
+                self.assertEqual(parse_html_to_text_cached("https://example.com/a.htm", "ua"), "Tender Offer")
+                self.assertIsNone(parse_html_to_text_cached("https://example.com/missing.htm", "ua"))
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_cached_parse_retries_transient_errors(self) -> None:
+        _parse_cached.cache_clear()
+        self.addCleanup(_parse_cached.cache_clear)
+        body = b"<html><body><p>Tender Offer</p></body></html>"
+        throttled = MagicMock()
+        throttled.status_code = 429
+        throttled.raise_for_status.side_effect = requests.HTTPError("429", response=throttled)
+        responses = [requests.exceptions.Timeout("timed out"), throttled, self._mock_response(body)]
+
+        def _get(url, **kwargs):
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with patch("src.processors.html_parser.SESSION.get", side_effect=_get) as mock_get:
+            self.assertIsNone(parse_html_to_text_cached("https://example.com/a.htm", "ua"))
+            self.assertIsNone(parse_html_to_text_cached("https://example.com/a.htm", "ua"))
+            self.assertEqual(parse_html_to_text_cached("https://example.com/a.htm", "ua"), "Tender Offer")
+            self.assertEqual(parse_html_to_text_cached("https://example.com/a.htm", "ua"), "Tender Offer")
+
+        self.assertEqual(mock_get.call_count, 3)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
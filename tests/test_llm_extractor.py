@@ -1,12 +1,21 @@
+import json
+import os
+import tempfile
 import unittest
 from decimal import Decimal
 from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 from src.models.corporate_action_model import CorporateAction, ActionType
+from src.processors import llm_extractor
 from src.processors.llm_extractor import (
     LLMExtractionResult,
     LLMMonetary,
     apply_llm_to_corporate_action,
+    _parse_extraction,
+    _select_prompt_text,
+    llm_extract_batch,
 )
 
 
@@ -54,5 +63,145 @@ class LLMExtractorApplyTests(unittest.TestCase):
         self.assertIsNone(updated.effective_date)
 
 
+class LLMExtractorParseTests(unittest.TestCase):
+    def test_parse_extraction_from_fenced_reply(self) -> None:
+        content = (
+            "```json\n"
+            '{"action_type": "cash_dividend", "pay_date": "2025-09-30",'
+            ' "cash_per_share": {"currency": "USD", "amount": 0.25}}\n'
+            "```"
+        )
+
+        res = _parse_extraction(content)
+
+        self.assertEqual(res.action_type, ActionType.CASH_DIVIDEND)
+        self.assertEqual(res.pay_date, date(2025, 9, 30))
+        self.assertEqual(res.cash_per_share.amount, Decimal("0.25"))
+
+
+class LLMExtractorPromptTextTests(unittest.TestCase):
+    def test_short_text_is_unchanged(self) -> None:
+        self.assertEqual(_select_prompt_text("Item 8.01 Other Events"), "Item 8.01 Other Events")
+
+    def test_long_text_keeps_cover_and_keyword_windows_within_budget(self) -> None:
+        cover = "FORM 8-K cover page. " * 50
+        filler = "Lorem ipsum boilerplate. " * 4000
+        terms = "The merger consideration is $10.25 per share; the effective date is Sep 30, 2025."
+        text = cover + filler + terms + filler
+
+        selected = _select_prompt_text(text)
+
+        self.assertLessEqual(len(selected), 20000)
+        self.assertTrue(selected.startswith("FORM 8-K cover page."))
+        self.assertIn("$10.25 per share", selected)
+
+
+class LLMExtractorBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        llm_extractor._CLIENT_CACHE.clear()
+
+    @patch.dict(os.environ, {"LLM_ENABLED": "true", "OPENAI_API_KEY": "sk-test"})
+    def test_batch_submits_jsonl_and_maps_results_by_custom_id(self) -> None:
+        output_lines = [
+            {
+                "custom_id": "a",
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": '{"action_type": "bankruptcy"}'}}]},
+                },
+                "error": None,
+            },
+            {"custom_id": "b", "response": None, "error": {"message": "failed"}},
+        ]
+        client = MagicMock()
+        client.files.create.return_value = SimpleNamespace(id="file-in")
+        client.batches.create.return_value = SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None)
+        client.batches.retrieve.return_value = SimpleNamespace(id="batch-1", status="completed", output_file_id="file-out")
+        client.files.content.return_value = SimpleNamespace(text="\n".join(json.dumps(l) for l in output_lines))
+
+        with patch("src.processors.llm_extractor.OpenAI", return_value=client), patch(
+            "src.processors.llm_extractor.time.sleep"
+        ):
+            results = llm_extract_batch([("a", "text a", "A Co"), ("b", "text b", None)])
+
+        self.assertEqual(set(results), {"a"})
+        self.assertEqual(results["a"].action_type, ActionType.BANKRUPTCY)
+        _, payload = client.files.create.call_args[1]["file"]
+        submitted = [json.loads(line) for line in payload.decode("utf-8").splitlines()]
+        self.assertEqual([r["custom_id"] for r in submitted], ["a", "b"])
+        self.assertEqual(submitted[0]["url"], "/v1/chat/completions")
+        self.assertIn("A Co", submitted[0]["body"]["messages"][1]["content"])
+
+
+class LLMSemanticCacheTests(unittest.TestCase):
+    DIVIDEND = "ABC Inc. declared a quarterly dividend of {amount} per share payable {date}."
+
+    def setUp(self) -> None:
+        llm_extractor._CLIENT_CACHE.clear()
+        llm_extractor._SEMANTIC_CACHE = None
+        self.addCleanup(setattr, llm_extractor, "_SEMANTIC_CACHE", None)
+        self.addCleanup(llm_extractor._CLIENT_CACHE.clear)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        env = {"LLM_ENABLED": "true", "OPENAI_API_KEY": "sk-test", "LLM_SEMANTIC_CACHE_DIR": tmp.name}
+        for p in (patch.dict(os.environ, env), patch("src.processors.llm_extractor.atexit.register")):
+            p.start()
+            self.addCleanup(p.stop)
+
+        # Every text embeds identically, as near-duplicate boilerplate filings do
+        self.client = MagicMock()
+        self.client.embeddings.create.return_value = SimpleNamespace(data=[SimpleNamespace(embedding=[1.0] * 1536)])
+        reply = SimpleNamespace(message=SimpleNamespace(content='{"action_type": "cash_dividend"}'))
+        self.client.chat.completions.create.return_value = SimpleNamespace(choices=[reply])
+        p = patch("src.processors.llm_extractor.OpenAI", return_value=self.client)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_identical_filing_hits_cache(self) -> None:
+        text = self.DIVIDEND.format(amount="$0.25", date="July 1, 2025")
+        llm_extractor.llm_extract(text, company="ABC Inc")
+        self.assertIsNotNone(llm_extractor.llm_extract(text, company="ABC Inc"))
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+        # The embedded text is the prompt text
+        self.assertEqual(self.client.embeddings.create.call_args.kwargs["input"], text)
+
+    def test_embedding_input_is_capped(self) -> None:
+        text = "The merger consideration is $10.25 per share. " * 800
+        llm_extractor.llm_extract(text, company="ABC Inc")
+        embedded = self.client.embeddings.create.call_args.kwargs["input"]
+        self.assertEqual(len(embedded), llm_extractor._EMBED_CHARS)
+
+    def test_different_dates_or_amounts_miss_cache(self) -> None:
+        llm_extractor.llm_extract(self.DIVIDEND.format(amount="$0.25", date="July 1, 2025"), company="ABC Inc")
+        llm_extractor.llm_extract(self.DIVIDEND.format(amount="$0.25", date="October 1, 2025"), company="ABC Inc")
+        llm_extractor.llm_extract(self.DIVIDEND.format(amount="$0.30", date="July 1, 2025"), company="ABC Inc")
+        self.assertEqual(self.client.chat.completions.create.call_count, 3)
+
+    def test_use_cache_false_bypasses_cache(self) -> None:
+        text = self.DIVIDEND.format(amount="$0.25", date="July 1, 2025")
+        llm_extractor.llm_extract(text, company="ABC Inc")
+        llm_extractor.llm_extract(text, company="ABC Inc", use_cache=False)
+        self.assertEqual(self.client.chat.completions.create.call_count, 2)
+        self.assertEqual(self.client.embeddings.create.call_count, 1)
+
+
+class LLMClientReuseTests(unittest.TestCase):
+    def setUp(self) -> None:
+        llm_extractor._CLIENT_CACHE.clear()
+
+    def tearDown(self) -> None:
+        llm_extractor._CLIENT_CACHE.clear()
+
+    def test_client_is_created_once_per_api_key(self) -> None:
+        with patch("src.processors.llm_extractor.OpenAI", side_effect=lambda api_key: MagicMock()) as ctor:
+            a1 = llm_extractor._get_client("key-a")
+            a2 = llm_extractor._get_client("key-a")
+            b = llm_extractor._get_client("key-b")
+
+        self.assertIs(a1, a2)
+        self.assertIsNot(a1, b)
+        self.assertEqual(ctor.call_count, 2)
+
+
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
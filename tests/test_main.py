@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.main import _enrich_filings, _lookup_enrichment
+
+
+class EnrichFilingsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mapper = MagicMock()
+        self.mapper.to_dataframe.return_value = pd.DataFrame(
+            [{"cik": "42", "ticker": "FOO", "exchange": "NYSE"}],
+            columns=["cik", "ticker", "exchange"],
+        )
+        # Master-index CIKs are unpadded; 7 has no known security
+        filings = pd.DataFrame({"cik": ["42", "7", "42"], "file_name": ["a.txt", "b.txt", "c.txt"]})
+        self.enrichment_by_cik = _enrich_filings(filings, self.mapper)
+
+    def test_joined_fields_by_unpadded_cik(self) -> None:
+        self.assertEqual(
+            self.enrichment_by_cik["42"],
+            {"ticker": "FOO", "exchange": "NYSE", "exchange_mic": "XNYS"},
+        )
+
+    def test_missing_security_becomes_none(self) -> None:
+        self.assertEqual(self.enrichment_by_cik["7"], {"ticker": None, "exchange": None, "exchange_mic": None})
+
+    def test_padded_header_cik_matches_index_row(self) -> None:
+        self.assertEqual(
+            _lookup_enrichment("0000000042", self.enrichment_by_cik, self.mapper),
+            ("FOO", "NYSE", "XNYS"),
+        )
+        self.assertEqual(_lookup_enrichment("0000000007", self.enrichment_by_cik, self.mapper), ("N/A", None, None))
+        self.mapper.get_ticker_by_cik.assert_not_called()
+
+    def test_cik_outside_batch_falls_back_to_scalar_lookups(self) -> None:
+        self.mapper.get_ticker_by_cik.return_value = "BAR"
+        self.mapper.get_exchange_by_cik.return_value = "NASDAQ"
+
+        self.assertEqual(
+            _lookup_enrichment("0000000099", self.enrichment_by_cik, self.mapper),
+            ("BAR", "NASDAQ", "XNAS"),
+        )
+        self.mapper.get_ticker_by_cik.assert_called_once_with("0000000099")
+
+    def test_empty_batch(self) -> None:
+        self.assertEqual(_enrich_filings(pd.DataFrame(columns=["cik"]), self.mapper), {})
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
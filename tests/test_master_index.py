@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from src.sources.master_index import _parse_master_index, get_recent_8k_filings_async
+
+
+INDEX_BODY = (
+    "Description: Daily Index of EDGAR Dissemination Feed by Company Name\n"
+    "\n"
+    "CIK|Company Name|Form Type|Date Filed|File Name\n"
+    "--------------------------------------------------------------------------------\n"
+    "1|Test Co|8-K|20250103|edgar/data/1/0000000001-25-000001.txt\n"
+    "2|Other Co|10-Q|20250103|edgar/data/2/0000000002-25-000001.txt\n"
+)
+
+
+class MasterIndexTests(unittest.TestCase):
+    def _run(self, handler, **kwargs):
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await get_recent_8k_filings_async(client=client, **kwargs)
+
+        return asyncio.run(run())
+
+    def test_probes_business_days_and_picks_most_recent(self) -> None:
+        requested = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requested.append(request.url.path)
+            # Monday 2025-01-06 is not published yet; Friday 2025-01-03 is
+            if request.url.path.endswith("master.20250103.idx"):
+                return httpx.Response(200, text=INDEX_BODY)
+            if request.url.path.endswith("master.20250102.idx"):
+                return httpx.Response(200, text=INDEX_BODY.replace("20250103", "20250102"))
+            return httpx.Response(404)
+
+        df = self._run(handler, days_ago=0, base_date_str="2025-01-06")
+
+        self.assertEqual(list(df["file_name"]), ["edgar/data/1/0000000001-25-000001.txt"])
+        self.assertEqual(list(df["formatted_date_filed"]), ["2025-01-03"])
+        self.assertEqual(list(df["accession_number"]), ["0000000001-25-000001"])
+        # Weekends are never requested
+        self.assertFalse(any(p.endswith(("master.20250104.idx", "master.20250105.idx")) for p in requested))
+        self.assertEqual(len(requested), 6)
+
+    @patch("src.sources.master_index.asyncio.sleep")
+    def test_retries_throttled_requests(self, sleep) -> None:
+        calls = {"n": 0}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("master.20250103.idx"):
+                calls["n"] += 1
+                if calls["n"] == 1:
+                    return httpx.Response(429)
+                return httpx.Response(200, text=INDEX_BODY)
+            return httpx.Response(404)
+
+        async def no_sleep(_):
+            return None
+
+        sleep.side_effect = no_sleep
+        df = self._run(handler, days_ago=0, base_date_str="2025-01-03")
+
+        self.assertEqual(len(df), 1)
+        self.assertEqual(calls["n"], 2)
+
+    def test_parse_keeps_cik_as_string_and_skips_malformed_rows(self) -> None:
+        body = INDEX_BODY + "0000003|Bad|Row\n" + "0000004|A|B|C|8-K|20250103|edgar/data/4/x.txt\n"
+        df = _parse_master_index(body)
+        self.assertEqual(list(df["cik"]), ["1"])
+
+        df = _parse_master_index(INDEX_BODY.replace("1|Test", "0000001|Test"))
+        self.assertEqual(list(df["cik"]), ["0000001"])
+
+    def test_parse_prefilters_other_forms(self) -> None:
+        body = INDEX_BODY + "3|Amend Co|8-K/A|20250103|edgar/data/3/0000000003-25-000001.txt\n"
+        df = _parse_master_index(body)
+        self.assertEqual(list(df["company"]), ["Test Co"])
+        self.assertTrue(_parse_master_index(INDEX_BODY, form_type="10-K").empty)
+
+    def test_returns_empty_frame_when_nothing_found(self) -> None:
+        df = self._run(lambda request: httpx.Response(404), days_ago=1, base_date_str="2025-01-06")
+        self.assertTrue(df.empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
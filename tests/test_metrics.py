@@ -1,3 +1,7 @@
+import io
+import json
+import os
+import tempfile
 import unittest
 
 from src.utils.metrics import Metrics
@@ -24,6 +28,42 @@ class MetricsTests(unittest.TestCase):
         self.assertAlmostEqual(s["fill_rate"], 0.5)
         self.assertAlmostEqual(s["est_or_def_rate"], 0.75)
 
+    def test_instances_have_no_dict(self) -> None:
+        m = Metrics()
+        self.assertFalse(hasattr(m, "__dict__"))
+        with self.assertRaises(AttributeError):
+            m.typo_counter = 1  # type: ignore[attr-defined]
+
+    def test_save_jsonl_appends_one_record_per_call(self) -> None:
+        m = Metrics()
+        m.record(effective_date=True, had_estimate=False, promoted=False, followup_used=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.jsonl")
+            m.save_jsonl(path)
+            m.save_jsonl(path)
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(
+            list(rows[0]),
+            ["processed", "definitive", "estimated", "promoted", "followup_used", "timestamp", "fill_rate", "est_or_def_rate"],
+        )
+        self.assertEqual(rows[0]["followup_used"], 1)
+        self.assertEqual(rows[0]["fill_rate"], 1.0)
+        self.assertRegex(rows[0]["timestamp"], r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$")
+
+    def test_save_jsonl_to_open_binary_file(self) -> None:
+        m = Metrics()
+        m.record(effective_date=False, had_estimate=True, promoted=False, followup_used=False)
+        buf = io.BytesIO()
+        m.save_jsonl(buf)
+        m.save_jsonl(buf)
+
+        lines = buf.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1])["estimated"], 1)
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
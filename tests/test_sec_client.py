@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+import io
+import time
+import unittest
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import requests
+from urllib3.response import HTTPResponse
+
+from src.utils.sec_client import SESSION, RateLimiter, read_body, sec_async_client
+
+
+class SecClientTests(unittest.TestCase):
+    def _gzip_response(self, payload: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = HTTPResponse(
+            body=io.BytesIO(gzip.compress(payload)),
+            headers={"Content-Encoding": "gzip"},
+            preload_content=False,
+        )
+        return response
+
+    def test_read_body_caps_decompressed_bytes(self) -> None:
+        payload = b"CIK|Company Name|Form Type\n" * 1000
+        self.assertEqual(read_body(self._gzip_response(payload), 64), payload[:64])
+
+    def test_rate_limiter_spaces_requests(self) -> None:
+        limiter = RateLimiter(rate=50)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        # First slot is immediate; the next four are 20 ms apart
+        self.assertGreaterEqual(time.monotonic() - start, 0.075)
+
+    def test_async_client_sends_headers_through_shared_limiter(self) -> None:
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers["User-Agent"])
+            return httpx.Response(200)
+
+        async def run():
+            async with sec_async_client("ua", transport=httpx.MockTransport(handler)) as client:
+                await asyncio.gather(*(client.get(f"https://www.sec.gov/{i}") for i in range(3)))
+
+        with patch("src.utils.sec_client.SEC_RATE_LIMITER.acquire_async", new_callable=AsyncMock) as acquire:
+            asyncio.run(run())
+
+        self.assertEqual(seen, ["ua"] * 3)
+        self.assertEqual(acquire.await_count, 3)
+
+    def _status_response(self, status: int, headers: Optional[dict] = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        response.raw = MagicMock()
+        return response
+
+    def test_session_retries_take_a_limiter_slot_each(self) -> None:
+        responses = [
+            self._status_response(429, {"Retry-After": "2"}),
+            self._status_response(503),
+            self._status_response(200),
+        ]
+        with patch("requests.adapters.HTTPAdapter.send", side_effect=responses) as send, \
+                patch("src.utils.sec_client.SEC_RATE_LIMITER.acquire") as acquire, \
+                patch("src.utils.sec_client.time.sleep") as sleep:
+            response = SESSION.get("https://www.sec.gov/a.htm", headers={"User-Agent": "ua"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(acquire.call_count, 3)
+        # Retry-After wins over the first 1 s backoff; the second retry backs off 2 s
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [2.0, 2.0])
+
+    def test_session_does_not_retry_post(self) -> None:
+        with patch("requests.adapters.HTTPAdapter.send", return_value=self._status_response(503)) as send, \
+                patch("src.utils.sec_client.SEC_RATE_LIMITER.acquire") as acquire, \
+                patch("src.utils.sec_client.time.sleep") as sleep:
+            response = SESSION.post("https://www.sec.gov/a.htm", data=b"x")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(acquire.call_count, 1)
+        sleep.assert_not_called()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -5,12 +5,20 @@ from src.sources import sec_submissions as ss
 
 
 class SECSubmissionsTests(unittest.TestCase):
-    @patch("requests.get")
-    def test_get_company_submissions_uses_padded_cik(self, mock_get):
+    def setUp(self) -> None:
+        ss._SUBMISSIONS_CACHE.clear()
+
+    def _json_response(self, body: bytes, status_code: int = 200, etag=None) -> Mock:
         mock_resp = Mock()
         mock_resp.raise_for_status.return_value = None
-        mock_resp.json.return_value = {"ok": True}
-        mock_get.return_value = mock_resp
+        mock_resp.status_code = status_code
+        mock_resp.content = body
+        mock_resp.headers = {"ETag": etag} if etag else {}
+        return mock_resp
+
+    @patch("src.sources.sec_submissions.SESSION.get")
+    def test_get_company_submissions_uses_padded_cik(self, mock_get):
+        mock_get.return_value = self._json_response(b'{"ok": true}')
 
         cik = "320193"  # Apple
         user_agent = "test-agent"
@@ -23,6 +31,21 @@ class SECSubmissionsTests(unittest.TestCase):
         headers = mock_get.call_args[1]["headers"]
         self.assertEqual(headers["User-Agent"], user_agent)
 
+    @patch("src.sources.sec_submissions.SESSION.get")
+    def test_get_company_submissions_revalidates_with_etag(self, mock_get):
+        mock_get.side_effect = [
+            self._json_response(b'{"v": 1}', etag='"abc"'),
+            self._json_response(b"", status_code=304),
+        ]
+
+        first = ss.get_company_submissions("320193", "ua")
+        second = ss.get_company_submissions("320193", "ua")
+
+        self.assertEqual(first, {"v": 1})
+        self.assertIs(second, first)
+        self.assertNotIn("If-None-Match", mock_get.call_args_list[0][1]["headers"])
+        self.assertEqual(mock_get.call_args_list[1][1]["headers"]["If-None-Match"], '"abc"')
+
     @patch("src.sources.sec_submissions.get_company_submissions")
     def test_get_recent_company_filings_filters_and_builds_urls(self, mock_submissions):
         mock_submissions.return_value = {
@@ -0,0 +1,93 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.processors.semantic_llm_cache import SemanticCache
+
+
+class SemanticCacheTests(unittest.TestCase):
+    def test_lookup_hits_near_duplicate_for_same_key_only(self) -> None:
+        cache = SemanticCache(dim=3, threshold=0.97)
+        cache.add([1.0, 0.0, 0.0], '{"action_type": "merger_cash"}', key="Olo Inc")
+
+        self.assertEqual(cache.lookup([0.99, 0.05, 0.0], key="Olo Inc"), '{"action_type": "merger_cash"}')
+        self.assertIsNone(cache.lookup([0.99, 0.05, 0.0], key="Other Co"))
+        self.assertIsNone(cache.lookup([0.0, 1.0, 0.0], key="Olo Inc"))
+
+    def test_other_keys_do_not_crowd_out_same_key_entry(self) -> None:
+        cache = SemanticCache(dim=3, threshold=0.97)
+        for i in range(8):
+            cache.add([1.0, 0.0, 0.0], f'{{"n": {i}}}', key=f"Other {i}")
+        cache.add([0.99, 0.05, 0.0], '{"n": "olo"}', key="Olo Inc")
+
+        self.assertEqual(cache.lookup([1.0, 0.0, 0.0], key="Olo Inc"), '{"n": "olo"}')
+        self.assertEqual(cache.search([1.0, 0.0, 0.0], key="Missing"), (-1, 0.0))
+
+    def test_faiss_path_widens_k_until_same_key_found(self) -> None:
+        class _FlatIP:
+            """Stand-in for faiss.IndexFlatIP (exact top-k inner product)."""
+
+            def __init__(self) -> None:
+                self.rows = np.zeros((0, 3), dtype=np.float32)
+                self.ks = []
+
+            def add(self, vecs) -> None:
+                self.rows = np.vstack([self.rows, vecs])
+
+            def search(self, query, k):
+                self.ks.append(k)
+                sims = self.rows @ query[0]
+                top = np.argsort(-sims, kind="stable")[:k]
+                return sims[top][None, :], top[None, :]
+
+        cache = SemanticCache(dim=3, threshold=0.97)
+        cache._index = index = _FlatIP()
+        for i in range(12):
+            cache.add([1.0, 0.0, 0.0], "{}", key=f"Other {i}")
+        cache.add([0.99, 0.05, 0.0], '{"n": "olo"}', key="Olo Inc")
+
+        self.assertEqual(cache.lookup([1.0, 0.0, 0.0], key="Olo Inc"), '{"n": "olo"}')
+        self.assertEqual(index.ks, [5, 10, 13])
+
+    def test_search_on_empty_cache(self) -> None:
+        self.assertEqual(SemanticCache(dim=3).search([1.0, 0.0, 0.0]), (-1, 0.0))
+
+    def test_save_and_load_roundtrip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SemanticCache(dim=3, cache_dir=Path(tmp))
+            cache.add([0.0, 0.0, 2.0], '{"notes": "x"}', key=None)
+            cache.save()
+
+            loaded = SemanticCache.load(Path(tmp), dim=3)
+
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded.lookup([0.0, 0.0, 1.0]), '{"notes": "x"}')
+        self.assertIsNone(loaded.lookup([0.0, 0.0, 1.0], key="other"))
+
+    def test_many_adds_keep_every_row(self) -> None:
+        cache = SemanticCache(dim=2, threshold=0.99)
+        for i in range(40):
+            cache.add([1.0, float(i)], f"r{i}", key=str(i))
+
+        self.assertEqual(len(cache), 40)
+        self.assertEqual(cache.lookup([1.0, 39.0], key="39"), "r39")
+        self.assertEqual(cache.lookup([1.0, 0.0], key="0"), "r0")
+
+    def test_save_writes_only_when_changed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SemanticCache(dim=3, cache_dir=Path(tmp) / "c")
+            cache.save()
+            self.assertFalse((Path(tmp) / "c").exists())
+            cache.add([1.0, 0.0, 0.0], "{}")
+            cache.save()
+            self.assertTrue((Path(tmp) / "c" / "results.jsonl").exists())
+
+    def test_add_rejects_wrong_dimension(self) -> None:
+        with self.assertRaises(ValueError):
+            SemanticCache(dim=3).add([1.0, 0.0], "{}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()